@@ -0,0 +1,116 @@
+"""Fitness backends for the genetic algorithm.
+
+A backend is an object with evaluate(positions) -> fitness vector for decoded layouts of shape (pop, n_turbines, 2).
+Passed as ga_config['fitness_backend'] it replaces the built-in fitness function; it is called once per batch of
+layouts to evaluate, so a backend that drives an external wake simulator sees the whole batch at once.
+
+    backend = WakeSimulatorBackend(pywake_simulator(wind_farm_model, wd=wind_directions, ws=[9.8]),
+                                   fitness_weights, area_size, min_spacing)
+    genetic_algorithm(dict(ga_config, fitness_backend=backend))
+"""
+from abc import ABC, abstractmethod
+import numpy as np
+from fitness import evaluate_fitness_batch, penalty_terms, combine_fitness_terms, energy_from_wake_deficit
+from offset_tables import TABLES_DIR, OffsetTables, evaluate_fitness_tables
+from utils import determine_num_bits
+from wake_sweep import WakeSweep, evaluate_fitness_sweep
+from wind_rose import WindRose, directional_wake_deficit, evaluate_fitness_wind_rose
+
+
+class FitnessBackend(ABC):
+    """Interface of the fitness backends."""
+
+    @abstractmethod
+    def evaluate(self, positions):
+        """Fitness vector of decoded layouts of shape (pop, n_turbines, 2)."""
+
+
+class JensenBackend(FitnessBackend):
+    """The built-in Jensen style model, which genetic_algorithm.backend_setup builds from the ga_config.
+
+    evaluate_fitness_batch for one wind direction or, with a WindRose, evaluate_fitness_wind_rose. With
+    wake_tolerance the directional model (a single sector for wind_direction) is evaluated with a WakeSweep that
+    leaves out wake deficits below the tolerance. Otherwise offset_tables, the cache directory of OffsetTables
+    (TABLES_DIR for True), gathers the pair terms of either model from the tables; the fitness values stay the
+    same."""
+
+    def __init__(self, weights, area_size, min_spacing, wind_speed, wind_direction=None, wind_rose=None,
+                 power_curve=None, wake_tolerance=None, offset_tables=None):
+        self.weights = weights
+        self.area_size = area_size
+        self.min_spacing = min_spacing
+        self.wind_speed = wind_speed
+        self.wind_direction = wind_direction
+        self.wind_rose = wind_rose
+        self.power_curve = power_curve
+        if wake_tolerance:
+            if self.wind_rose is None:
+                self.wind_rose = WindRose([1.0], [wind_direction])
+            self.fitness_function, model = evaluate_fitness_sweep, WakeSweep(self.wind_rose, wake_tolerance)
+        elif offset_tables:
+            cache_dir = TABLES_DIR if offset_tables is True else offset_tables
+            model = OffsetTables(determine_num_bits(area_size), min_spacing, wind_rose, cache_dir)
+            self.fitness_function = evaluate_fitness_tables
+        elif wind_rose is not None:
+            self.fitness_function, model = evaluate_fitness_wind_rose, wind_rose
+        else:
+            self.fitness_function, model = evaluate_fitness_batch, wind_direction
+        # every built-in fitness function takes (positions, weights, area_size, min_spacing, wind_speed, model,
+        # power_curve)
+        self.fitness_params = (weights, area_size, min_spacing, wind_speed, model, power_curve)
+
+    def evaluate(self, positions):
+        return self.fitness_function(positions, *self.fitness_params)
+
+
+class WakeSimulatorBackend(FitnessBackend):
+    """Adapter for a wake simulator computing the energy production of a whole batch of layouts in one call.
+
+    simulate(x, y) gets the turbine coordinates as arrays of shape (pop, n_turbines) and returns the energy
+    production of every layout, shape (pop,). The boundary and spacing terms and the validity penalty are added
+    as in evaluate_fitness_batch, so the weights mean the same for every backend."""
+
+    def __init__(self, simulate, weights, area_size, min_spacing):
+        self.simulate = simulate
+        self.weights = weights
+        self.area_size = area_size
+        self.min_spacing = min_spacing
+
+    def evaluate(self, positions):
+        positions = np.asarray(positions, dtype=float)
+        energy_production = np.asarray(self.simulate(positions[..., 0], positions[..., 1]), dtype=float)
+        boundary_fitness, spacing_fitness, is_valid = penalty_terms(positions, self.area_size, self.min_spacing)
+        return combine_fitness_terms(self.weights, energy_production, boundary_fitness, spacing_fitness, is_valid)
+
+
+def pywake_simulator(wind_farm_model, **simulation_kwargs):
+    """simulate function for WakeSimulatorBackend running a PyWake WindFarmModel on every layout of the batch.
+
+    Each layout is simulated as a farm of its own: layouts placed side by side in one farm wake each other in the
+    sectors along the line joining them, however far apart, and the cost grows with the square of the whole
+    batch. The AEP [GWh] of every turbine is summed per layout; simulation_kwargs (wd, ws, ...) are passed to the
+    model."""
+    def simulate(x, y):
+        return np.array([float(wind_farm_model(layout_x, layout_y, **simulation_kwargs).aep().sum())
+                         for layout_x, layout_y in zip(np.asarray(x, dtype=float), np.asarray(y, dtype=float))])
+    return simulate
+
+
+class JensenSimulator:
+    """Local stand-in for an external wake simulator, e.g. to test a WakeSimulatorBackend offline.
+
+    Evaluates the directional Jensen top-hat model of wind_rose.directional_wake_deficit for a whole batch of
+    layouts in one call; a single wind_direction is a wind rose with one sector. Counts its calls in self.calls."""
+
+    def __init__(self, wind_speed, wind_direction=None, wind_rose=None, power_curve=None):
+        self.wind_speed = wind_speed
+        self.wind_rose = wind_rose if wind_rose is not None else WindRose([1.0], [wind_direction])
+        self.power_curve = power_curve
+        self.calls = 0
+
+    def __call__(self, x, y):
+        self.calls += 1
+        positions = np.stack([x, y], axis=-1)
+        sector_energy = energy_from_wake_deficit(directional_wake_deficit(positions, self.wind_rose), self.wind_speed,
+                                                 self.power_curve)
+        return self.wind_rose.mean(sector_energy)
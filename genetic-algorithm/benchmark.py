@@ -0,0 +1,190 @@
+"""Benchmarks of the GA operators and fitness evaluation over a grid of farm and population sizes.
+
+    python benchmark.py --output bench.json
+    python benchmark.py --turbines 14 200 --population 100 1000 --compare bench.json
+
+Every benchmark reports the median wall time over --repeats runs, the throughput in layouts per second and the
+peak memory traced by tracemalloc in a separate run. With --compare, results slower than the baseline by more
+than --threshold are reported as regressions and the script exits with status 1.
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+import numpy as np
+from crossover import crossover
+from fitness import evaluate_fitness
+from genetic_algorithm import genetic_algorithm
+from mutation import mutation
+from replacement import replacement
+from selection import selection
+from utils import determine_num_bits, encode_genome
+
+
+MIN_SPACING = 50
+FITNESS_WEIGHTS = {
+    'energy_production': 0.5,
+    'boundary_fitness': 0.2,
+    'spacing_fitness': 0.2,
+    'wake_fitness': 0.1,
+    'is_valid': 100,
+}
+
+
+def make_problem(n_turbines, population_size, seed=0):
+    """Random genome population on a square site sized so that the layouts are about half feasible, and the
+    ga_config of the problem."""
+    rng = np.random.default_rng(seed)
+    area_size = int(MIN_SPACING * math.sqrt(n_turbines) * 2)
+    num_bits = determine_num_bits(area_size)
+    positions = rng.integers(0, area_size + 1, size=(population_size, n_turbines, 2))
+    ga_config = {
+        'n_turbines': n_turbines,
+        'area_size': area_size,
+        'min_spacing': MIN_SPACING,
+        'wind_speed': 9.8,
+        'wind_direction': 270.0,
+        'fitness_weights': FITNESS_WEIGHTS,
+        'population_size': population_size,
+        'max_generations': 2,
+        'max_stagnation': 10,
+        'mutation_rate': 0.01,
+        'fitness_cache_size': 0,
+        'keep_history': False,
+        'verbose': False,
+    }
+    return encode_genome(positions, num_bits), num_bits, ga_config
+
+
+def benchmark_cases(population, num_bits, ga_config, with_fitness=True):
+    """Benchmarked callables taking no arguments, inputs are prepared up front and not timed.
+    Without with_fitness the fitness benchmarks are left out and the operators get stand-in fitness values."""
+    fitness_params = tuple(ga_config[key] for key in ('fitness_weights', 'area_size', 'min_spacing', 'wind_speed',
+                                                      'wind_direction'))
+    mutation_rate = ga_config['mutation_rate']
+
+    def fitness(layouts):
+        if with_fitness:
+            return np.asarray(evaluate_fitness(layouts, *fitness_params))
+        return -layouts.astype(float).sum(axis=(1, 2))
+
+    fitness_values = fitness(population)
+    parents = selection(population, fitness_values)
+    offspring = crossover(parents, num_bits)
+    offspring_fitness_values = fitness(offspring)
+
+    cases = {
+        'selection': lambda: selection(population, fitness_values),
+        'crossover': lambda: crossover(parents, num_bits),
+        'mutation': lambda: mutation(offspring, mutation_rate, num_bits=num_bits),
+        'replacement': lambda: replacement(population, offspring, fitness_values, offspring_fitness_values),
+    }
+    if with_fitness:
+        cases['evaluate_fitness'] = lambda: fitness(population)
+        # the evaluated population is passed in, so the run breeds and evaluates a single generation
+        cases['generation'] = lambda: genetic_algorithm(dict(ga_config, max_generations=2,
+                                                             initial_population=population,
+                                                             initial_fitness_values=fitness_values))
+    return cases
+
+
+def measure(function, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(times), peak_memory
+
+
+def run_benchmarks(turbines, populations, repeats, max_pairs, only=None):
+    results = []
+    for n_turbines in turbines:
+        for population_size in populations:
+            random.seed(0)
+            np.random.seed(0)
+            population, num_bits, ga_config = make_problem(n_turbines, population_size)
+            with_fitness = population_size * n_turbines ** 2 <= max_pairs
+            if not with_fitness:
+                print(f'n_turbines={n_turbines} population_size={population_size}: '
+                      f'over {max_pairs:.0e} pairs, fitness benchmarks skipped')
+            cases = benchmark_cases(population, num_bits, ga_config, with_fitness)
+
+            for name, function in cases.items():
+                if only and name not in only:
+                    continue
+                seconds, peak_memory = measure(function, repeats)
+                result = {
+                    'benchmark': name,
+                    'n_turbines': n_turbines,
+                    'population_size': population_size,
+                    'seconds': seconds,
+                    'layouts_per_second': population_size / seconds if seconds else float('inf'),
+                    'peak_memory_bytes': peak_memory,
+                }
+                results.append(result)
+                print(f"{name:<17} n_turbines={n_turbines:<5} population_size={population_size:<6} "
+                      f"{seconds * 1e3:10.2f} ms {result['layouts_per_second']:12.0f} layouts/s "
+                      f"{peak_memory / 2**20:9.1f} MiB")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return the results slower than the matching baseline entry by more than threshold (a fraction)."""
+    baseline_seconds = {(entry['benchmark'], entry['n_turbines'], entry['population_size']): entry['seconds']
+                        for entry in baseline['results']}
+    regressions = []
+    for result in results:
+        key = (result['benchmark'], result['n_turbines'], result['population_size'])
+        if key in baseline_seconds and result['seconds'] > baseline_seconds[key] * (1 + threshold):
+            regressions.append(dict(result, baseline_seconds=baseline_seconds[key],
+                                    slowdown=result['seconds'] / baseline_seconds[key]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turbines', type=int, nargs='+', default=[14, 50, 200, 1000])
+    parser.add_argument('--population', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--max-pairs', type=float, default=2e8,
+                        help='skip fitness benchmarks when population_size * n_turbines**2 exceeds this')
+    parser.add_argument('--only', nargs='+', help='run only these benchmarks')
+    parser.add_argument('--output', default='bench.json')
+    parser.add_argument('--compare', help='baseline json written by an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.1, help='allowed slowdown against the baseline')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.turbines, args.population, args.repeats, args.max_pairs, args.only)
+    report = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f'results written to {args.output}')
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression['benchmark']} n_turbines={regression['n_turbines']} "
+                  f"population_size={regression['population_size']}: {regression['seconds'] * 1e3:.2f} ms, "
+                  f"baseline {regression['baseline_seconds'] * 1e3:.2f} ms ({regression['slowdown']:.2f}x)")
+        if regressions:
+            raise SystemExit(1)
+        print('no regressions')
+
+
+if __name__ == '__main__':
+    main()
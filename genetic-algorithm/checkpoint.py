@@ -0,0 +1,55 @@
+import os
+import random
+import tempfile
+import numpy as np
+
+
+def rng_state():
+    """State of the random and np.random generators as a dict of arrays."""
+    version, internal_state, gauss_next = random.getstate()
+    bit_generator, keys, position, has_gauss, cached_gaussian = np.random.get_state()
+    return {
+        'random_version': np.array(version),
+        'random_state': np.array(internal_state, dtype=np.uint32),
+        'random_gauss_next': np.array([] if gauss_next is None else [gauss_next], dtype=float),
+        'np_random_bit_generator': np.array(bit_generator),
+        'np_random_keys': keys,
+        'np_random_position': np.array(position),
+        'np_random_has_gauss': np.array(has_gauss),
+        'np_random_cached_gaussian': np.array(cached_gaussian),
+    }
+
+
+def set_rng_state(state):
+    """Restore the random and np.random generators from a dict written by rng_state."""
+    gauss_next = state['random_gauss_next']
+    random.setstate((int(state['random_version']), tuple(int(value) for value in state['random_state']),
+                     float(gauss_next[0]) if len(gauss_next) else None))
+    np.random.set_state((str(state['np_random_bit_generator']), state['np_random_keys'],
+                         int(state['np_random_position']), int(state['np_random_has_gauss']),
+                         float(state['np_random_cached_gaussian'])))
+
+
+def save_checkpoint(path, **arrays):
+    """Write arrays and the current RNG state to an .npz file atomically.
+    The file is written next to path first and then renamed over it, so a crash never leaves a partial checkpoint."""
+    directory = os.path.dirname(os.path.abspath(path))
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix='.npz.tmp')
+    try:
+        with os.fdopen(file_descriptor, 'wb') as file:
+            np.savez(file, **arrays, **rng_state())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def load_checkpoint(path, restore_rng=True):
+    """Read a checkpoint written by save_checkpoint into a dict of arrays and, by default, restore the RNG state."""
+    with np.load(path) as checkpoint:
+        arrays = {name: checkpoint[name] for name in checkpoint.files}
+    if restore_rng:
+        set_rng_state(arrays)
+    return arrays
@@ -0,0 +1,76 @@
+"""Shared fixtures of the tests, run with
+
+    cd genetic-algorithm && python -m pytest -q
+"""
+import random
+import numpy as np
+import pytest
+from genetic_algorithm import genetic_algorithm
+
+
+FITNESS_WEIGHTS = {
+    'energy_production': 0.5,
+    'boundary_fitness': 0.2,
+    'spacing_fitness': 0.2,
+    'wake_fitness': 0.1,
+    'is_valid': 100,
+}
+
+
+@pytest.fixture
+def ga_config():
+    """A small problem, as configured in main.py."""
+    return {
+        'n_turbines': 12,
+        'area_size': 300,
+        'min_spacing': 50,
+        'wind_speed': 9.8,
+        'wind_direction': 270.0,
+        'fitness_weights': dict(FITNESS_WEIGHTS),
+        'population_size': 20,
+        'max_generations': 9,
+        'max_stagnation': 100,
+        'mutation_rate': 0.01,
+        'verbose': False,
+    }
+
+
+@pytest.fixture
+def fitness_params(ga_config):
+    """The arguments of evaluate_fitness_batch after the positions."""
+    return tuple(ga_config[key] for key in ('fitness_weights', 'area_size', 'min_spacing', 'wind_speed',
+                                            'wind_direction'))
+
+
+@pytest.fixture
+def random_positions():
+    def random_positions(population_size, n_turbines, high, seed=0):
+        """Random integer layouts, a few with coincident or too close turbines."""
+        positions = np.random.default_rng(seed).integers(0, high, size=(population_size, n_turbines, 2))
+        positions[:3, 1] = positions[:3, 0]
+        positions[3:6, 1] = positions[3:6, 0] + [3, 4]
+        return positions
+    return random_positions
+
+
+
+@pytest.fixture
+def seeded_run():
+    def seeded_run(ga_config, seed):
+        """genetic_algorithm(ga_config) with the global generators seeded."""
+        random.seed(seed)
+        np.random.seed(seed)
+        return genetic_algorithm(ga_config)
+    return seeded_run
+
+
+@pytest.fixture
+def assert_same_result():
+    def assert_same_result(result, expected):
+        """Both results of genetic_algorithm are identical, history included."""
+        assert result[0][0] == expected[0][0]
+        np.testing.assert_array_equal(result[0][1], expected[0][1])
+        assert result[1][0] == expected[1][0]
+        np.testing.assert_array_equal(result[1][1], expected[1][1])
+        assert result[2] == expected[2]
+    return assert_same_result
@@ -1,101 +1,149 @@
-import random
+import functools
+import numpy as np
+from utils import genome_to_population, population_to_genome
 
 
-def onepoint_layouts_pair_crossover(parents):
-    """Perform single-point crossover to create offspring from consecutive pair of parents."""
-    offspring = []
-    for i in range(0, len(parents) - 1, 2):
-        parent1 = parents[i]
-        parent2 = parents[i+1]
+def _genome_operator(operator):
+    """Let an operator on genome arrays of shape (pop, n_turbines, 2) also take a list of binary string layouts.
+    The offspring are returned in the representation of the parents."""
+    @functools.wraps(operator)
+    def wrapper(parents, num_bits=None, **kwargs):
+        if isinstance(parents, np.ndarray):
+            return operator(parents, num_bits, **kwargs)
+        num_bits = len(parents[0][0]) // 2
+        return genome_to_population(operator(population_to_genome(parents), num_bits, **kwargs), num_bits)
+    return wrapper
 
-        crossover_point = random.randint(1, len(parent1) - 1)
-        offspring1 = parent1[:crossover_point] + parent2[crossover_point:]
-        offspring2 = parent2[:crossover_point] + parent1[crossover_point:]
 
-        offspring.append(offspring1)
-        offspring.append(offspring2)
-    return offspring
+def _require_num_bits(num_bits):
+    if num_bits is None:
+        raise ValueError("num_bits is required to run bitwise crossover on a genome array.")
 
 
-def onepoint_layouts_crossover(parents):
-    """Perform single-point crossover to create offspring for each parent with random one. Split layouts."""
-    offspring = []
-    for i in range(len(parents)):
-        random_index = random.choice([j for j in range(len(parents)) if j != i])
-        parent1 = parents[i]
-        parent2 = parents[random_index]
+def _consecutive_pairs(parents):
+    """Parents 2i and 2i+1 as two arrays, an odd last parent is left out."""
+    n_pairs = len(parents) // 2
+    return parents[0:2 * n_pairs:2], parents[1:2 * n_pairs:2]
+
+
+def _random_partners(parents):
+    """Every parent together with a random other parent."""
+    n_parents = len(parents)
+    partners = (np.arange(n_parents) + np.random.randint(1, n_parents, size=n_parents)) % n_parents
+    return parents, parents[partners]
+
+
+def _interleave(offspring1, offspring2):
+    """Order offspring as [offspring1[0], offspring2[0], offspring1[1], ...]."""
+    return np.stack([offspring1, offspring2], axis=1).reshape(-1, *offspring1.shape[1:])
+
+
+def _swap(parent1, parent2, from_parent1):
+    """Offspring taking the genes marked in from_parent1 from parent1 and the rest from parent2, and vice versa."""
+    return _interleave(np.where(from_parent1, parent1, parent2), np.where(from_parent1, parent2, parent1))
 
-        crossover_point = random.randint(1, len(parent1) - 1)
-        offspring1 = parent1[:crossover_point] + parent2[crossover_point:]
-        offspring2 = parent2[:crossover_point] + parent1[crossover_point:]
 
-        offspring.append(offspring1)
-        offspring.append(offspring2)
-    return offspring
+def _high_bits_mask(cut_points, num_bits):
+    """Mask of the cut_points most significant bits of a num_bits wide word."""
+    cut_points = np.asarray(cut_points, dtype=np.int64)
+    return ((1 << num_bits) - 1) ^ ((1 << (num_bits - cut_points)) - 1)
+
+
+def _bitwise_swap(parent1, parent2, mask):
+    return _interleave((parent1 & mask) | (parent2 & ~mask), (parent2 & mask) | (parent1 & ~mask))
+
+
+@_genome_operator
+def onepoint_layouts_pair_crossover(parents, num_bits=None):
+    """Perform single-point crossover to create offspring from consecutive pair of parents."""
+    parent1, parent2 = _consecutive_pairs(parents)
+    crossover_points = np.random.randint(1, parents.shape[1], size=len(parent1))
+    from_parent1 = np.arange(parents.shape[1]) < crossover_points[:, np.newaxis]
+    return _swap(parent1, parent2, from_parent1[..., np.newaxis])
+
+
+@_genome_operator
+def onepoint_layouts_crossover(parents, num_bits=None):
+    """Perform single-point crossover to create offspring for each parent with random one. Split layouts."""
+    parent1, parent2 = _random_partners(parents)
+    crossover_points = np.random.randint(1, parents.shape[1], size=len(parent1))
+    from_parent1 = np.arange(parents.shape[1]) < crossover_points[:, np.newaxis]
+    return _swap(parent1, parent2, from_parent1[..., np.newaxis])
 
 
-def twopoint_layouts_crossover(parents):
+@_genome_operator
+def twopoint_layouts_crossover(parents, num_bits=None):
     """Perform crossover to create offspring from parent individuals using two-point crossover. Split layouts."""
-    offspring = []
-    for i in range(0, len(parents) - 1, 2):
-        parent1 = parents[i]
-        parent2 = parents[i+1]
+    parent1, parent2 = _consecutive_pairs(parents)
+    cut_spots = np.sort(np.random.randint(1, parents.shape[1], size=(len(parent1), 2)), axis=1)
+    turbines = np.arange(parents.shape[1])
+    from_parent2 = (turbines >= cut_spots[:, :1]) & (turbines < cut_spots[:, 1:])
+    return _swap(parent1, parent2, ~from_parent2[..., np.newaxis])
 
-        cut_spot_1 = random.randint(1, len(parent1) - 1)
-        cut_spot_2 = random.randint(1, len(parent1) - 1)
-        offspring1 = parent1[:cut_spot_1] + parent2[cut_spot_1:cut_spot_2] + parent1[cut_spot_2:]
-        offspring2 = parent2[:cut_spot_1] + parent1[cut_spot_1:cut_spot_2] + parent2[cut_spot_2:]
 
-        offspring.append(offspring1)
-        offspring.append(offspring2)
-    return offspring
+@_genome_operator
+def uniform_crossover(parents, num_bits=None, swap_probability=0.5):
+    """Create offspring from consecutive pair of parents, each turbine is taken from either parent at random."""
+    parent1, parent2 = _consecutive_pairs(parents)
+    from_parent2 = np.random.random(parent1.shape[:2]) < swap_probability
+    return _swap(parent1, parent2, ~from_parent2[..., np.newaxis])
 
 
-def onepoint_position_crossover(parents):
+@_genome_operator
+def onepoint_position_crossover(parents, num_bits=None):
     """Create offspring for each parent with random one. Split combined x,y position strings in random point."""
-    offspring = []
-    for i in range(len(parents)):
-        random_index = random.choice([j for j in range(len(parents)) if j != i])
-        parent1 = parents[i]
-        parent2 = parents[random_index]
-
-        offspring1, offspring2 = [], []
-        for turbine_index in range(len(parent1)):
-            crossover_point = random.randint(1, len(parent1) - 1)
-            offspring1.append(parent1[turbine_index][:crossover_point] + parent2[turbine_index][crossover_point:])
-            offspring2.append(parent2[turbine_index][:crossover_point] + parent1[turbine_index][crossover_point:])
-        offspring.append(offspring1)
-        offspring.append(offspring2)
-    return offspring
-
-
-def onepoint_coordinate_crossover(parents):
+    _require_num_bits(num_bits)
+    parent1, parent2 = _random_partners(parents)
+    word1 = (parent1[..., 0].astype(np.int64) << num_bits) | parent1[..., 1]
+    word2 = (parent2[..., 0].astype(np.int64) << num_bits) | parent2[..., 1]
+    crossover_points = np.random.randint(1, 2 * num_bits, size=word1.shape)
+    words = _bitwise_swap(word1, word2, _high_bits_mask(crossover_points, 2 * num_bits))
+    offspring = np.stack([words >> num_bits, words & ((1 << num_bits) - 1)], axis=-1)
+    return offspring.astype(parents.dtype)
+
+
+@_genome_operator
+def onepoint_coordinate_crossover(parents, num_bits=None):
     """Create offspring for each parent with random one. Split each x and y position string in random point."""
-    offspring = []
-    for i in range(len(parents)):
-        random_index = random.choice([j for j in range(len(parents)) if j != i])
-        parent1 = parents[i]
-        parent2 = parents[random_index]
-
-        offspring1, offspring2 = [], []
-        for turbine in range(len(parent1)):
-            cord_separator = len(parent1)//2
-            crossover_point_x = random.randint(1, cord_separator - 1)
-            crossover_point_y = random.randint(cord_separator, len(parent1) - 1)
-            offspring1_x = parent1[turbine][:crossover_point_x] + parent2[turbine][crossover_point_x:cord_separator]
-            offspring1_y = parent1[turbine][cord_separator:crossover_point_y] + parent2[turbine][crossover_point_y:]
-            offspring2_x = parent2[turbine][:crossover_point_x] + parent1[turbine][crossover_point_x:cord_separator]
-            offspring2_y = parent2[turbine][cord_separator:crossover_point_y] + parent1[turbine][crossover_point_y:]
-            offspring1.append(offspring1_x + offspring1_y)
-            offspring2.append(offspring2_x + offspring2_y)
-        offspring.append(offspring1)
-        offspring.append(offspring2)
-    return offspring
-
-
-def crossover(parents):
-    return onepoint_layouts_pair_crossover(parents)
-    # return onepoint_layouts_crossover(parents)
-    # return twopoint_layouts_crossover(parents)
-    # return onepoint_position_crossover(parents)
-    # return onepoint_coordinate_crossover(parents)
+    _require_num_bits(num_bits)
+    parent1, parent2 = _random_partners(parents)
+    crossover_points = np.random.randint(1, max(2, num_bits), size=parent1.shape)
+    mask = _high_bits_mask(crossover_points, num_bits).astype(parents.dtype)
+    return _bitwise_swap(parent1, parent2, mask)
+
+
+@_genome_operator
+def arithmetic_crossover(parents, num_bits=None):
+    """Offspring of consecutive pairs of parents are the weighted averages l*p1 + (1-l)*p2 and (1-l)*p1 + l*p2
+    of the decoded coordinates, with one random weight l per pair."""
+    _require_num_bits(num_bits)
+    parent1, parent2 = _consecutive_pairs(parents.astype(float))
+    weights = np.random.random(len(parent1))[:, np.newaxis, np.newaxis]
+    offspring = _interleave(weights * parent1 + (1 - weights) * parent2, (1 - weights) * parent1 + weights * parent2)
+    return np.clip(np.rint(offspring), 0, (1 << num_bits) - 1).astype(parents.dtype)
+
+
+@_genome_operator
+def blend_crossover(parents, num_bits=None, alpha=0.5):
+    """BLX-alpha crossover of consecutive pairs of parents: every coordinate of both offspring is drawn uniformly
+    from the parents' interval extended by alpha times its length on both sides."""
+    _require_num_bits(num_bits)
+    parent1, parent2 = _consecutive_pairs(parents.astype(float))
+    low, high = np.minimum(parent1, parent2), np.maximum(parent1, parent2)
+    extent = alpha * (high - low)
+    offspring = np.random.uniform(low - extent, high + extent, size=(2,) + parent1.shape)
+    offspring = _interleave(offspring[0], offspring[1])
+    return np.clip(np.rint(offspring), 0, (1 << num_bits) - 1).astype(parents.dtype)
+
+
+def crossover(parents, num_bits=None):
+    """Crossover entry point. Parents can be a list of binary string layouts or a genome array,
+    num_bits is needed only by the bitwise and arithmetic operators on a genome array."""
+    return onepoint_layouts_pair_crossover(parents, num_bits)
+    # return onepoint_layouts_crossover(parents, num_bits)
+    # return twopoint_layouts_crossover(parents, num_bits)
+    # return uniform_crossover(parents, num_bits)
+    # return onepoint_position_crossover(parents, num_bits)
+    # return onepoint_coordinate_crossover(parents, num_bits)
+    # return arithmetic_crossover(parents, num_bits)
+    # return blend_crossover(parents, num_bits)
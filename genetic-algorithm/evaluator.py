@@ -0,0 +1,103 @@
+import math
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+import numpy as np
+from fitness import evaluate_fitness_batch
+from utils import decode_population
+
+
+# fitness function and parameters of a pool worker, set once by _init_worker
+_worker_fitness = None
+
+
+def _init_worker(fitness_function, fitness_params):
+    global _worker_fitness
+    _worker_fitness = (fitness_function, fitness_params)
+
+
+def _evaluate_chunk(positions):
+    fitness_function, fitness_params = _worker_fitness
+    return fitness_function(positions, *fitness_params)
+
+
+def _evaluate_chunk_with_params(fitness_function, fitness_params, positions):
+    return fitness_function(positions, *fitness_params)
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, start, time.perf_counter()
+
+
+class FitnessEvaluator:
+    """Evaluate population fitness serially or chunked across a process pool.
+
+    With n_workers > 1 a ProcessPoolExecutor is started whose workers receive the fitness function and parameters
+    once, at initialization, so only the decoded layouts are sent every generation. An external executor can be
+    passed instead, then the parameters travel with each chunk and n_workers, its number of workers, is required.
+    A population is split into n_workers chunks (or chunks of chunk_size layouts). Every layout is evaluated
+    independently and the chunks are reassembled in order, so the results do not depend on the number of workers.
+    With a FitnessCache only layouts missing from the cache are evaluated."""
+
+    def __init__(self, fitness_params, n_workers=None, executor=None, chunk_size=None,
+                 fitness_function=evaluate_fitness_batch, cache=None):
+        if executor is not None and n_workers is None:
+            raise ValueError("n_workers, the number of workers of the executor, is required with an executor.")
+        self.fitness_params = fitness_params
+        self.cache = cache
+        self.fitness_function = fitness_function
+        self.n_workers = n_workers or 1
+        self.chunk_size = chunk_size
+        self.executor = executor
+        self._owns_executor = False
+        if executor is None and self.n_workers > 1:
+            self.executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                                initargs=(fitness_function, fitness_params))
+            self._owns_executor = True
+
+    def __call__(self, population):
+        """Return the fitness vector of a population (list of binary string layouts or genome array)."""
+        positions = decode_population(population)
+        if self.cache is not None:
+            return self.cache.evaluate(positions, self._evaluate_positions)
+        return self._evaluate_positions(positions)
+
+    def _evaluate_positions(self, positions):
+        if self.executor is None or len(positions) < 2:
+            return self.fitness_function(positions, *self.fitness_params)
+
+        chunk_size = self.chunk_size or math.ceil(len(positions) / self.n_workers)
+        chunks = [positions[start:start + chunk_size] for start in range(0, len(positions), chunk_size)]
+        if self._owns_executor:
+            results = self.executor.map(_evaluate_chunk, chunks)
+        else:
+            results = self.executor.map(_evaluate_chunk_with_params, [self.fitness_function] * len(chunks),
+                                        [self.fitness_params] * len(chunks), chunks)
+        return np.concatenate(list(results))
+
+    def submit(self, population):
+        """Start evaluating a population as a single task, bypassing the cache. Returns a Future of the fitness vector
+        and the perf_counter times at which the evaluation started and ended; without an executor the evaluation is
+        done before returning."""
+        positions = decode_population(population)
+        if self.executor is None:
+            future = Future()
+            future.set_result(_timed(self.fitness_function, positions, *self.fitness_params))
+            return future
+        if self._owns_executor:
+            return self.executor.submit(_timed, _evaluate_chunk, positions)
+        return self.executor.submit(_timed, _evaluate_chunk_with_params, self.fitness_function, self.fitness_params,
+                                    positions)
+
+    def close(self):
+        if self._owns_executor:
+            self.executor.shutdown()
+            self.executor = None
+            self._owns_executor = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
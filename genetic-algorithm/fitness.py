@@ -1,7 +1,17 @@
 import numpy as np
+from power_curve import DEFAULT_POWER_CURVE
+from spatial import close_pairs, close_pairs_batch
 from utils import *
 
 
+ROTOR_RADIUS = 136/2
+C_T = 0.89  # thrust coefficient, 0.89 for simplicity, tbd
+K_W = 0.075  # wake decay coefficient, 0.075 is typical for onshore wind farms
+
+# upper bound on the number of pairwise entries (pop * n * n) broadcast at once by evaluate_fitness_batch
+BATCH_MAX_PAIRS = 2**24
+
+
 def fitness_boundary_constraint(layout, area_size):
     """ Evaluate the layout based on the boundary constraints."""
     boundary_penalty = 0
@@ -15,11 +25,8 @@ def fitness_boundary_constraint(layout, area_size):
 def fitness_uniform_spacing(layout, min_spacing):
     """Evaluate the layout based on the uniform spacing of turbines."""
     spacing_penalty = 0
-    for i, pos1 in enumerate(layout):
-        for pos2 in layout[i+1:]:
-            distance = euclidean_distance(pos1, pos2)
-            if distance < min_spacing:
-                spacing_penalty += (min_spacing - distance) ** 2
+    for _, _, distance in close_pairs(layout, min_spacing):
+        spacing_penalty += (min_spacing - distance) ** 2
     return -spacing_penalty
 
 
@@ -68,9 +75,9 @@ def fitness_wake_zone_penalty(layout, wind_direction, spread_angle=10):
 
 
 def calculate_layout_energy_production(layout, wind_speed):
-    rotor_radius = 136/2
-    C_t = 0.89  # thrust coefficient, 0.89 for simplicity, tbd
-    k_w = 0.075  # wake decay coefficient, 0.075 is typical for onshore wind farms
+    rotor_radius = ROTOR_RADIUS
+    C_t = C_T
+    k_w = K_W
 
     total_energy = 0
     for pos1 in layout:
@@ -101,20 +108,115 @@ def fitness_multi_objective(layout, weights, area_size, min_spacing, wind_speed,
     return total_fitness
 
 
-def evaluate_fitness(population, weights, area_size, min_spacing, wind_speed, wind_direction):
-    """Calculate the fitness (total energy production) for each candidate solution in the population."""
+def pair_terms(positions_a, positions_b, min_spacing):
+    """Pairwise terms between broadcastable position arrays of shape (..., 2): wake deficit (zero for turbines
+    sharing a position), spacing penalty and whether the pair violates the minimum spacing."""
+    diff = np.asarray(positions_a, dtype=float) - np.asarray(positions_b, dtype=float)
+    distances = np.sqrt((diff ** 2).sum(axis=-1))
+
+    coincident = (diff == 0).all(axis=-1)
+    deficit = (1 - math.sqrt(1 - C_T)) * (ROTOR_RADIUS / (K_W * distances + ROTOR_RADIUS)) ** 2
+    wake_terms = np.where(coincident, 0.0, deficit)
+
+    too_close = distances < min_spacing
+    spacing_terms = np.where(too_close, (min_spacing - distances) ** 2, 0.0)
+    return wake_terms, spacing_terms, too_close
+
+
+def energy_from_wake_deficit(wake_deficit, wind_speed, power_curve=None):
+    """Energy production of layouts given the summed wake deficit at each turbine, shape (..., n_turbines).
+    power_curve maps an array of effective wind speeds to power, DEFAULT_POWER_CURVE by default."""
+    effective_wind_speed = wind_speed * (1 - np.minimum(1, wake_deficit))
+    return (power_curve or DEFAULT_POWER_CURVE)(effective_wind_speed).sum(axis=-1)
+
+
+def boundary_terms(positions, area_size):
+    """Boundary fitness and whether all turbines are within the area, for positions of shape (..., n_turbines, 2)."""
+    x, y = positions[..., 0], positions[..., 1]
+    boundary_fitness = -((x < 0) | (x >= area_size) | (y < 0) | (y >= area_size)).sum(axis=-1).astype(float)
+    within_bounds = ((x >= 0) & (x <= area_size) & (y >= 0) & (y <= area_size)).all(axis=-1)
+    return boundary_fitness, within_bounds
+
+
+def fitness_terms_batch(positions, area_size, min_spacing, wind_speed, power_curve=None):
+    """Evaluate the fitness terms for a batch of decoded layouts of shape (pop, n_turbines, 2) in one broadcast pass.
+    Returns energy production, boundary fitness, spacing fitness and validity vectors of length pop."""
+    positions = np.asarray(positions, dtype=float)
+    n_turbines = positions.shape[1]
+
+    wake_terms, spacing_terms, too_close = pair_terms(positions[:, :, np.newaxis, :], positions[:, np.newaxis, :, :],
+                                                      min_spacing)
+    energy_production = energy_from_wake_deficit(wake_terms.sum(axis=-1), wind_speed, power_curve)
 
-    num_bits = len(population[0][0]) // 2
-    population_decoded = [[decode_binary_to_position(pos, num_bits) for pos in layout] for layout in population]
+    # every unordered pair is counted once, as in fitness_uniform_spacing and is_layout_valid
+    pairs = np.triu(np.ones((n_turbines, n_turbines), dtype=bool), k=1)
+    too_close &= pairs
+    spacing_fitness = -np.where(pairs, spacing_terms, 0.0).sum(axis=(1, 2))
 
-    fitness_values = []
-    for layout in population_decoded:
-        total_fitness = fitness_multi_objective(layout, weights, area_size, min_spacing, wind_speed, wind_direction)
-        fitness_values.append(total_fitness)
+    boundary_fitness, within_bounds = boundary_terms(positions, area_size)
+    is_valid = within_bounds & ~too_close.any(axis=(1, 2))
 
+    return energy_production, boundary_fitness, spacing_fitness, is_valid
+
+
+def penalty_terms(positions, area_size, min_spacing):
+    """Boundary fitness, spacing fitness and validity of decoded layouts of shape (pop, n_turbines, 2) without the
+    wake model, for fitness functions that get the energy production elsewhere. Only the pairs found by
+    close_pairs_batch are visited."""
+    positions = np.asarray(positions, dtype=float)
+    population_size, n_turbines = positions.shape[:2]
+    first, _, distances = close_pairs_batch(positions, min_spacing)
+    layout_index = first // n_turbines
+
+    spacing_fitness = -np.bincount(layout_index, weights=(min_spacing - distances) ** 2, minlength=population_size)
+    any_too_close = np.bincount(layout_index, minlength=population_size) > 0
+
+    boundary_fitness, within_bounds = boundary_terms(positions, area_size)
+    return boundary_fitness, spacing_fitness, within_bounds & ~any_too_close
+
+
+def combine_fitness_terms(weights, energy_production, boundary_fitness, spacing_fitness, is_valid):
+    """Weighted sum of the fitness term vectors, as in fitness_multi_objective."""
+    is_valid_fitness = np.where(is_valid, 0.0, -energy_production)
+    return (weights['energy_production'] * energy_production +
+            weights['boundary_fitness'] * spacing_fitness +
+            weights['spacing_fitness'] * boundary_fitness +
+            weights['is_valid'] * is_valid_fitness
+            )
+
+
+def evaluate_fitness_batch(positions, weights, area_size, min_spacing, wind_speed, wind_direction, power_curve=None):
+    """Vectorized fitness_multi_objective for a whole population of decoded layouts of shape (pop, n_turbines, 2).
+    The population is split into chunks so that the pairwise arrays stay within BATCH_MAX_PAIRS entries.
+    An optional power_curve (see power_curve.py) replaces the default turbine power curve."""
+    positions = np.asarray(positions, dtype=float)
+    population_size, n_turbines = positions.shape[:2]
+    chunk_size = max(1, BATCH_MAX_PAIRS // max(1, n_turbines * n_turbines))
+
+    fitness_values = np.empty(population_size)
+    for start in range(0, population_size, chunk_size):
+        chunk = positions[start:start + chunk_size]
+        energy_production, boundary_fitness, spacing_fitness, is_valid = fitness_terms_batch(
+            chunk, area_size, min_spacing, wind_speed, power_curve)
+        fitness_values[start:start + chunk_size] = combine_fitness_terms(
+            weights, energy_production, boundary_fitness, spacing_fitness, is_valid)
     return fitness_values
 
 
+def evaluate_fitness(population, weights, area_size, min_spacing, wind_speed, wind_direction, cache=None):
+    """Calculate the fitness (total energy production) for each candidate solution in the population.
+    Layouts already stored in the optional FitnessCache are not evaluated again."""
+
+    population_decoded = decode_population(population)
+    fitness_params = (weights, area_size, min_spacing, wind_speed, wind_direction)
+    if cache is not None:
+        fitness_values = cache.evaluate(population_decoded, lambda positions: evaluate_fitness_batch(positions, *fitness_params))
+    else:
+        fitness_values = evaluate_fitness_batch(population_decoded, *fitness_params)
+
+    return fitness_values.tolist()
+
+
 def fitness_max_energy_production(layout, weights, wind_speed):
     total_energy = sum((power_output(wind_speed) for turbine in layout))
     return weights['energy_production'] * total_energy
@@ -0,0 +1,63 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+
+def layout_keys(positions):
+    """Canonical hash of each decoded layout in a (pop, n_turbines, 2) array.
+    Turbines are sorted first, so layouts listing the same positions in a different order share a key."""
+    positions = np.asarray(positions, dtype=np.int64)
+    order = np.lexsort((positions[..., 1], positions[..., 0]), axis=-1)
+    canonical = np.ascontiguousarray(np.take_along_axis(positions, order[..., np.newaxis], axis=1))
+    return [hashlib.blake2b(layout.tobytes(), digest_size=16).digest() for layout in canonical]
+
+
+class FitnessCache:
+    """Bounded LRU cache of layout fitness values keyed on layout_keys.
+
+    Holds at most max_entries values (a 16 byte key and a float each), the least recently used are evicted first.
+    The cached values are only valid for one set of fitness parameters, so a cache should not outlive its GA run."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    def evaluate(self, positions, fitness_function):
+        """Return the fitness vector of positions, calling fitness_function(positions) only for uncached layouts."""
+        keys = layout_keys(positions)
+        fitness_values = np.empty(len(keys))
+
+        missing = {}
+        for i, key in enumerate(keys):
+            if key in self._values:
+                self._values.move_to_end(key)
+                fitness_values[i] = self._values[key]
+                self.hits += 1
+            else:
+                missing.setdefault(key, []).append(i)
+
+        if missing:
+            first_indices = [indices[0] for indices in missing.values()]
+            new_values = fitness_function(np.asarray(positions)[first_indices])
+            for (key, indices), value in zip(missing.items(), new_values):
+                fitness_values[indices] = value
+                self._put(key, value)
+            self.misses += len(missing)
+            # repeated layouts within one batch are evaluated once
+            self.hits += sum(len(indices) - 1 for indices in missing.values())
+
+        return fitness_values
+
+    def _put(self, key, value):
+        self._values[key] = value
+        self._values.move_to_end(key)
+        while len(self._values) > self.max_entries:
+            self._values.popitem(last=False)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._values)}
@@ -1,78 +1,511 @@
-from fitness import evaluate_fitness
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from backends import JensenBackend
+from checkpoint import save_checkpoint, load_checkpoint
+from evaluator import FitnessEvaluator
+from fitness_cache import FitnessCache
+from gradients import fitness_gradient
+from history import open_history
+from instrumentation import StageTimer, peak_memory, profiling
+from incremental_fitness import IncrementalFitness
+from local_search import gradient_refine
+from power_curve import TabularPowerCurve
+from repair import repair
+from surrogate import SurrogateScreen
+from wind_rose import WindRose
 from selection import selection
 from crossover import crossover
 from mutation import mutation
-from replacement import replacement
+from replacement import replacement, steady_state_replacement
 from utils import *
 
 
-def genetic_algorithm(ga_config):
-    """Run the genetic algorithm"""
+def backend_setup(ga_config):
+    """FitnessBackend evaluating the fitness for ga_config: a ga_config['fitness_backend'] (see backends.py), or
+    else the built-in model as a JensenBackend with the options wind_direction, wind_rose (path of a wind rose
+    csv), wake_tolerance and offset_tables. ga_config['power_curve'] is the path of a tabular power curve csv
+    replacing the default power curve."""
+    if ga_config.get('fitness_backend') is not None:
+        return ga_config['fitness_backend']
+    wind_rose = WindRose.from_csv(ga_config['wind_rose']) if ga_config.get('wind_rose') else None
+    power_curve = TabularPowerCurve.from_csv(ga_config['power_curve']) if ga_config.get('power_curve') else None
+    return JensenBackend(ga_config['fitness_weights'], ga_config['area_size'], ga_config['min_spacing'],
+                         ga_config['wind_speed'], ga_config.get('wind_direction'), wind_rose, power_curve,
+                         ga_config.get('wake_tolerance'), ga_config.get('offset_tables'))
+
+
+def fitness_setup(ga_config):
+    """Fitness function and its parameters (after the positions) for ga_config, the evaluate of its
+    backend_setup."""
+    return backend_setup(ga_config).evaluate, ()
+
+
+def gradient_setup(ga_config):
+    """Gradient over the decoded positions of the smooth part of the fitness of fitness_setup (see
+    gradients.fitness_gradient). The wake sweep gets the gradient of the exact directional model it approximates."""
+    backend = backend_setup(ga_config)
+    if not isinstance(backend, JensenBackend):
+        raise ValueError("Gradients are only available for the built-in wake models, not for a fitness_backend.")
+
+    def gradient(positions):
+        return fitness_gradient(positions, backend.weights, backend.area_size, backend.min_spacing,
+                                backend.wind_speed, backend.wind_rose, backend.power_curve)[1]
+    return gradient
+
+
+def evaluator_setup(ga_config, backend, cache=None):
+    """FitnessEvaluator of the backend with ga_config['n_workers'] processes or ga_config['executor']."""
+    return FitnessEvaluator((), ga_config.get('n_workers'), ga_config.get('executor'),
+                            fitness_function=backend.evaluate, cache=cache)
+
+
+def cache_setup(ga_config):
+    """FitnessCache of ga_config['fitness_cache_size'] layouts, None without it."""
+    fitness_cache_size = ga_config.get('fitness_cache_size', 0)
+    return FitnessCache(fitness_cache_size) if fitness_cache_size else None
+
+
+def incremental_setup(ga_config, backend):
+    """IncrementalFitness of the backend with ga_config['incremental_fitness'], None without it."""
+    if not ga_config.get('incremental_fitness'):
+        return None
+    if ga_config.get('wind_rose'):
+        raise ValueError("incremental_fitness is only supported for a single wind direction.")
+    if ga_config.get('fitness_backend') is not None or ga_config.get('wake_tolerance'):
+        raise ValueError("incremental_fitness is only supported for the built-in all pairs fitness function.")
+    if ga_config.get('surrogate'):
+        raise ValueError("incremental_fitness and surrogate can not be combined.")
+    return IncrementalFitness(backend.weights, backend.area_size, backend.min_spacing, backend.wind_speed,
+                              backend.wind_direction, backend.power_curve)
+
+
+def surrogate_setup(ga_config):
+    """SurrogateScreen of the offspring with ga_config['surrogate'], None without it."""
+    if not ga_config.get('surrogate'):
+        return None
+    return SurrogateScreen(ga_config['area_size'], ga_config['min_spacing'], ga_config.get('surrogate_budget', 0.5),
+                           ga_config.get('surrogate_exploration', 0.1))
+
+
+def memetic_setup(ga_config):
+    """refine(population, fitness_values, evaluate) -> (population, fitness_values, stats) running
+    local_search.gradient_refine on the best ga_config['memetic_top_k'] individuals, None without it."""
+    top_k = ga_config.get('memetic_top_k', 0)
+    if not top_k:
+        return None
+    area_size = ga_config['area_size']
+    num_bits = determine_num_bits(area_size)
+    steps, step_size = ga_config.get('memetic_steps', 3), ga_config.get('memetic_step_size', 10.0)
+    gradient = gradient_setup(ga_config)
+
+    def refine(population, fitness_values, evaluate):
+        top = np.argsort(-fitness_values, kind='stable')[:top_k]
+        refined, refined_fitness_values, local_evaluations = gradient_refine(
+            decode_population(population[top]), fitness_values[top],
+            lambda positions: evaluate(encode_genome(positions, num_bits)), gradient, area_size, steps, step_size)
+        stats = {'local_search_evaluations': local_evaluations,
+                 'local_search_improved': int((refined_fitness_values > fitness_values[top]).sum())}
+        population, fitness_values = population.copy(), fitness_values.copy()
+        population[top] = encode_genome(refined, num_bits)
+        fitness_values[top] = refined_fitness_values
+        return population, fitness_values, stats
+    return refine
+
+
+def checkpoint_state(population, incremental, screen):
+    """Arrays of the incremental fitness and the surrogate saved in a checkpoint next to the run's own state."""
+    state = {}
+    if incremental is not None:
+        state.update(zip(('incremental_wake', 'incremental_spacing', 'incremental_close_pairs'),
+                         incremental.population_state(population)))
+    if screen is not None:
+        state.update(zip(('surrogate_features', 'surrogate_fitness_values'), screen.state()))
+    return state
+
+
+def resume_setup(resume_from, incremental, screen):
+    """Checkpoint resume_from, with the incremental fitness and the surrogate restored from it."""
+    checkpoint = load_checkpoint(resume_from)
+    if incremental is not None:
+        incremental.restore(checkpoint['population'], (checkpoint['incremental_wake'],
+                                                       checkpoint['incremental_spacing'],
+                                                       checkpoint['incremental_close_pairs']))
+    if screen is not None:
+        if 'surrogate_features' not in checkpoint:
+            raise ValueError(f"{resume_from} was saved without surrogate, it can not resume a surrogate run.")
+        screen.restore(checkpoint['surrogate_features'], checkpoint['surrogate_fitness_values'])
+    return checkpoint
+
+
+def evolve(ga_config, migrate=None):
+    """Run the genetic algorithm as a generator of per-generation stats, see main.py for the ga_config options.
+    The stats hold the generation's best and average fitness, the best result so far, the stage timings, the number
+    of evaluations and the figures of the enabled features. The generator returns the same tuple as
+    genetic_algorithm. migrate(generation, population, fitness_values) -> (population, fitness_values) is called
+    after every replacement when given, e.g. by the island model."""
 
     n_turbines = ga_config['n_turbines']
     area_size = ga_config['area_size']
     min_spacing = ga_config['min_spacing']
-    wind_speed = ga_config['wind_speed']
-    wind_direction = ga_config['wind_direction']
-    fitness_weights = ga_config['fitness_weights']
 
     population_size = ga_config['population_size']
     mutation_rate = ga_config['mutation_rate']
     max_generations = ga_config['max_generations']
     max_stagnation = ga_config['max_stagnation']
-    fitness_params = (fitness_weights, area_size, min_spacing, wind_speed, wind_direction)
+    repair_offspring = ga_config.get('repair', False)
+    repair_iterations = ga_config.get('repair_iterations', 40)
+    initial_population = ga_config.get('initial_population')
+    initial_fitness_values = ga_config.get('initial_fitness_values')
+    checkpoint_path = ga_config.get('checkpoint_path')
+    checkpoint_interval = ga_config.get('checkpoint_interval', 10)
+    resume_from = ga_config.get('resume_from')
+    keep_history = ga_config.get('keep_history', True)
+    verbose = ga_config.get('verbose', True)
+    backend = backend_setup(ga_config)
+    if ga_config.get('wake_tolerance') and isinstance(backend, JensenBackend) and verbose:
+        wake_sweep = backend.fitness_params[4]
+        print(f"Wake sweep: cutoff at {wake_sweep.cutoff_distance:.0f} m, summed deficit at most "
+              f"{wake_sweep.max_deficit_error(n_turbines):.3g} below the exact model per turbine")
+    num_bits = determine_num_bits(area_size)
+    cache = cache_setup(ga_config)
+    incremental = incremental_setup(ga_config, backend)
+    screen = surrogate_setup(ga_config)
+    refine = memetic_setup(ga_config)
 
     solutions_max_fitness_values = []
     solutions_avg_fitness_values = []
     solutions_layouts = []
     best_result = [float('-inf'), -1]
+    best_layout = None
     best_result_generation = 0
     stagnation_counter = 0
+    start_generation = 0
 
-    population = initialize_population(population_size, n_turbines, area_size, min_spacing)
+    # timings of the stages producing the next generation
+    timer = StageTimer()
+    if resume_from:
+        checkpoint = resume_setup(resume_from, incremental, screen)
+        population, fitness_values = checkpoint['population'], checkpoint['fitness_values']
+        start_generation = int(checkpoint['generation'])
+        stagnation_counter = int(checkpoint['stagnation_counter'])
+        solutions_max_fitness_values = list(checkpoint['max_fitness_values'])
+        solutions_avg_fitness_values = checkpoint['avg_fitness_values'].tolist()
+        solutions_layouts = [decode_layout_to_position(layout) for layout in checkpoint['layouts']]
+        best_result = [checkpoint['best_fitness'][()], int(checkpoint['best_index'])]
+        best_result_generation = int(checkpoint['best_result_generation'])
+        if len(checkpoint['best_layout']):
+            best_layout = decode_layout_to_position(checkpoint['best_layout'])
+        if verbose:
+            print(f'Resuming from {resume_from} at generation {start_generation}')
+    elif initial_population is not None:
+        population = initial_population
+    else:
+        with timer('initialize'):
+            population = initialize_genome(population_size, n_turbines, area_size, min_spacing)
 
     # main GA loop
-    for generation in range(max_generations):
-        print(f'>>> Generation {generation}')
-
-        fitness_values = evaluate_fitness(population, *fitness_params)
-
-        # Update best result
-        current_best_result = max(zip(fitness_values, range(len(fitness_values))))
-        current_avg_result = sum(fitness_values) / len(fitness_values)
-        current_layout = decode_layout_to_position(population[current_best_result[1]])
-        solutions_max_fitness_values.append(current_best_result[0])
-        solutions_avg_fitness_values.append(current_avg_result)
-        solutions_layouts.append(current_layout)
-        if current_best_result[0] > best_result[0]:
-            best_result, best_result_generation = current_best_result, generation
-            print(f'>>>>>> new best result {best_result[0]}')
-            stagnation_counter = 0
-        else:
-            stagnation_counter += 1
-
-        # Check for stagnation
-        if stagnation_counter >= max_stagnation:
-            print(f"Terminating due to stagnation at generation {generation+1}.\n")
-            break
-        if generation == max_generations - 1:
-            print(f"Terminating due to reaching maximum of {generation+1} generations.\n")
-            break
-
-        # Next population
-        selected_parents = selection(population, fitness_values)
-        offspring = crossover(selected_parents)
-        mutated_offspring = mutation(offspring, mutation_rate, verbose=False)
-        population = replacement(population, mutated_offspring, fitness_values, fitness_params)
+    with evaluator_setup(ga_config, backend, cache) as evaluate, \
+            open_history(ga_config.get('history_path'), start_generation) as history:
+        # evaluations, cache use, surrogate, repair and local search statistics of the stages producing the next
+        # generation
+        evaluations = 0
+        surrogate_stats = {}
+        repair_stats = {}
+        local_search_stats = {}
+        cache_hits, cache_misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+        # every individual is evaluated once, replacement hands back the fitness of the survivors
+        if not resume_from and (initial_fitness_values is None or incremental is not None):
+            with timer('evaluate'):
+                fitness_values = evaluate(population) if incremental is None else incremental.evaluate(population)
+            evaluations = len(population)
+        elif not resume_from:
+            fitness_values = np.asarray(initial_fitness_values, dtype=float)
+        if screen is not None and not resume_from:
+            screen.add(population, fitness_values)
+        for generation in range(start_generation, max_generations):
+            if checkpoint_path and generation > start_generation and generation % checkpoint_interval == 0:
+                save_checkpoint(checkpoint_path, population=population, fitness_values=fitness_values,
+                                generation=generation, stagnation_counter=stagnation_counter,
+                                max_fitness_values=np.array(solutions_max_fitness_values, dtype=float),
+                                avg_fitness_values=np.array(solutions_avg_fitness_values, dtype=float),
+                                layouts=np.array(solutions_layouts, dtype=int).reshape(-1, n_turbines, 2),
+                                best_fitness=best_result[0], best_index=best_result[1],
+                                best_result_generation=best_result_generation,
+                                best_layout=np.array(best_layout if best_layout else [], dtype=int).reshape(-1, 2),
+                                **checkpoint_state(population, incremental, screen))
+
+            if verbose:
+                print(f'>>> Generation {generation}')
+
+            # Update best result
+            best_index = int(np.argmax(fitness_values))
+            current_best_result = (fitness_values[best_index], best_index)
+            current_avg_result = float(np.mean(fitness_values))
+            current_layout = decode_layout_to_position(population[best_index])
+            if keep_history:
+                solutions_max_fitness_values.append(current_best_result[0])
+                solutions_avg_fitness_values.append(current_avg_result)
+                solutions_layouts.append(current_layout)
+            if current_best_result[0] > best_result[0]:
+                best_result, best_result_generation = current_best_result, generation
+                best_layout = current_layout
+                if verbose:
+                    print(f'>>>>>> new best result {best_result[0]}')
+                stagnation_counter = 0
+            else:
+                stagnation_counter += 1
+
+            stats = {
+                'generation': generation,
+                'max_fitness': float(current_best_result[0]),
+                'avg_fitness': current_avg_result,
+                'best_layout': current_layout,
+                'best_fitness': float(best_result[0]),
+                'timings': timer.timings,
+                'evaluations': evaluations,
+                'evaluations_per_second': evaluations / timer.timings['evaluate'] if evaluations else 0.0,
+                'peak_memory_bytes': peak_memory(),
+                **surrogate_stats,
+                **repair_stats,
+                **local_search_stats,
+            }
+            if cache is not None:
+                stats['cache_hits'], stats['cache_misses'] = cache.hits - cache_hits, cache.misses - cache_misses
+                cache_hits, cache_misses = cache.hits, cache.misses
+                if verbose:
+                    print(f"fitness cache: {stats['cache_hits']} hits, {stats['cache_misses']} misses")
+            if repair_stats and verbose:
+                print(f"feasible offspring: {repair_stats['feasibility_rate_before_repair']:.0%} before repair, "
+                      f"{repair_stats['feasibility_rate']:.0%} after")
+            if history is not None:
+                history.write(stats)
+            yield stats
+
+            # Check for stagnation
+            if stagnation_counter >= max_stagnation:
+                if verbose:
+                    print(f"Terminating due to stagnation at generation {generation+1}.\n")
+                break
+            if generation == max_generations - 1:
+                if verbose:
+                    print(f"Terminating due to reaching maximum of {generation+1} generations.\n")
+                break
+
+            # Next population
+            timer = StageTimer()
+            with timer('selection'):
+                selected_parents = selection(population, fitness_values)
+            with timer('crossover'):
+                offspring = crossover(selected_parents, num_bits)
+            with timer('mutation'):
+                mutated_offspring = mutation(offspring, mutation_rate, verbose=False, num_bits=num_bits)
+            if repair_offspring:
+                with timer('repair'):
+                    mutated_offspring, feasible_before, feasible_after = repair(mutated_offspring, area_size,
+                                                                                min_spacing, repair_iterations)
+                repair_stats = {'feasibility_rate_before_repair': feasible_before, 'feasibility_rate': feasible_after}
+            with timer('evaluate'):
+                if incremental is not None:
+                    offspring_fitness_values = incremental.evaluate_offspring(mutated_offspring, selected_parents)
+                elif screen is not None:
+                    # only the offspring passing the surrogate screen are evaluated and compete for survival
+                    mutated_offspring, offspring_fitness_values, surrogate_stats = screen.screen(mutated_offspring,
+                                                                                                  evaluate)
+                else:
+                    offspring_fitness_values = evaluate(mutated_offspring)
+            evaluations = len(mutated_offspring)
+            with timer('replacement'):
+                population, fitness_values = replacement(population, mutated_offspring, fitness_values,
+                                                         offspring_fitness_values)
+            if migrate is not None:
+                with timer('migration'):
+                    population, fitness_values = migrate(generation, population, fitness_values)
+            if refine is not None:
+                with timer('local_search'):
+                    population, fitness_values, local_search_stats = refine(
+                        population, fitness_values, evaluate if incremental is None else incremental.evaluate)
+            if incremental is not None:
+                # bookkeeping of the incremental states, kept out of the evaluation time
+                with timer('retain'):
+                    incremental.retain(population)
 
     best_fitness = best_result[0]
-    best_layout = decode_layout_to_position(population[best_result[1]])
-    print(f"Best result found: P = {best_fitness} MW")
-    print(f"Best turbines layout found: {best_layout}")
-    print(f'Generation of best result {best_result_generation}')
-    print('-' * 40)
+    if verbose:
+        print(f"Best result found: P = {best_fitness} MW")
+        print(f"Best turbines layout found: {best_layout}")
+        print(f'Generation of best result {best_result_generation}')
+        print('-' * 40)
 
     return ((best_fitness, best_layout),
             (solutions_max_fitness_values, solutions_layouts),
             solutions_avg_fitness_values)
 
+
+def breed(population, fitness_values, n_children, mutation_rate, num_bits):
+    """n_children offspring of population bred with the selection, crossover and mutation entry points."""
+    n_parents = min(len(population), n_children + n_children % 2)
+    parents = take_individuals(selection(population, fitness_values), np.arange(n_parents))
+    offspring = mutation(crossover(parents, num_bits), mutation_rate, verbose=False, num_bits=num_bits)
+    return take_individuals(offspring, np.arange(min(n_children, len(offspring))))
+
+
+def evolve_asynchronous(ga_config):
+    """Asynchronous steady-state variant of evolve without generation barriers, see main.py for the ga_config
+    options. Batches of children are evaluated as separate tasks, two per worker, and each is inserted with
+    steady_state_replacement as soon as it comes back, so slow layouts only hold up their own worker. Every
+    stagnation_interval evaluations count as a generation, its stats hold the workers' utilization as well."""
+    for key in ('incremental_fitness', 'surrogate', 'memetic_top_k', 'checkpoint_path', 'resume_from'):
+        if ga_config.get(key):
+            raise ValueError(f"{key} is not supported by the asynchronous steady-state mode.")
+    area_size = ga_config['area_size']
+    min_spacing = ga_config['min_spacing']
+    population_size = ga_config['population_size']
+    mutation_rate = ga_config['mutation_rate']
+    max_stagnation = ga_config['max_stagnation']
+    max_evaluations = ga_config.get('max_evaluations') or (ga_config['max_generations'] - 1) * population_size
+    stagnation_interval = ga_config.get('stagnation_interval') or population_size
+    repair_offspring = ga_config.get('repair', False)
+    repair_iterations = ga_config.get('repair_iterations', 40)
+    keep_history = ga_config.get('keep_history', True)
+    verbose = ga_config.get('verbose', True)
+    backend = backend_setup(ga_config)
+    num_bits = determine_num_bits(area_size)
+
+    solutions_max_fitness_values = []
+    solutions_avg_fitness_values = []
+    solutions_layouts = []
+    best_fitness = float('-inf')
+    best_layout = None
+    best_result_generation = 0
+    stagnation_counter = 0
+
+    timer = StageTimer()
+    population = ga_config.get('initial_population')
+    if population is None:
+        with timer('initialize'):
+            population = initialize_genome(population_size, ga_config['n_turbines'], area_size, min_spacing)
+
+    with evaluator_setup(ga_config, backend) as evaluate, \
+            open_history(ga_config.get('history_path'), 0) as history:
+        n_workers = evaluate.n_workers
+        batch_size = ga_config.get('async_batch_size') or max(1, population_size // (2 * n_workers))
+        if ga_config.get('initial_fitness_values') is not None:
+            fitness_values = np.asarray(ga_config['initial_fitness_values'], dtype=float)
+        else:
+            with timer('evaluate'):
+                fitness_values = evaluate(population)
+
+        pending = {}
+        submitted = evaluations = window_evaluations = 0
+        busy_seconds = 0.0
+        window_start = time.perf_counter()
+        generation = 0
+        while True:
+            while len(pending) < 2 * n_workers and submitted < max_evaluations:
+                with timer('breed'):
+                    children = breed(population, fitness_values, min(batch_size, max_evaluations - submitted),
+                                     mutation_rate, num_bits)
+                    if repair_offspring:
+                        children = repair(children, area_size, min_spacing, repair_iterations)[0]
+                with timer('evaluate'):
+                    pending[evaluate.submit(children)] = children
+                submitted += len(children)
+            if not pending:
+                break
+            with timer('wait'):
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            with timer('replacement'):
+                # one batch at a time, the others are picked up by the next wait, so the generations stay
+                # stagnation_interval evaluations long; of the finished batches the first submitted goes first
+                future = next(future for future in pending if future in done)
+                children = pending.pop(future)
+                children_fitness_values, start, end = future.result()
+                # only the part of the task inside this generation, so the utilization stays within [0, 1]
+                busy_seconds += max(0.0, end - max(start, window_start))
+                evaluations += len(children)
+                window_evaluations += len(children)
+                population, fitness_values = steady_state_replacement(population, children, fitness_values,
+                                                                      children_fitness_values)
+            if window_evaluations < stagnation_interval and (pending or submitted < max_evaluations):
+                continue
+
+            best_index = int(np.argmax(fitness_values))
+            current_layout = decode_layout_to_position(population[best_index])
+            if keep_history:
+                solutions_max_fitness_values.append(fitness_values[best_index])
+                solutions_avg_fitness_values.append(float(np.mean(fitness_values)))
+                solutions_layouts.append(current_layout)
+            if fitness_values[best_index] > best_fitness:
+                best_fitness, best_layout = fitness_values[best_index], current_layout
+                best_result_generation = generation
+                stagnation_counter = 0
+            else:
+                stagnation_counter += 1
+            wall_seconds = time.perf_counter() - window_start
+            stats = {
+                'generation': generation,
+                'max_fitness': float(fitness_values[best_index]),
+                'avg_fitness': float(np.mean(fitness_values)),
+                'best_layout': current_layout,
+                'best_fitness': float(best_fitness),
+                'timings': timer.timings,
+                'evaluations': window_evaluations,
+                'evaluations_per_second': window_evaluations / wall_seconds,
+                'worker_utilization': busy_seconds / (n_workers * wall_seconds),
+                'peak_memory_bytes': peak_memory(),
+            }
+            if verbose:
+                print(f">>> Generation {generation}: {evaluations} evaluations, best {best_fitness}, "
+                      f"worker utilization {stats['worker_utilization']:.0%}")
+            if history is not None:
+                history.write(stats)
+            yield stats
+
+            if stagnation_counter >= max_stagnation:
+                if verbose:
+                    print(f"Terminating due to stagnation after {evaluations} evaluations.\n")
+                for future in pending:
+                    future.cancel()
+                break
+            generation += 1
+            timer = StageTimer()
+            window_evaluations = 0
+            busy_seconds = 0.0
+            window_start = time.perf_counter()
+
+    if verbose:
+        print(f"Best result found: P = {best_fitness} MW")
+        print(f"Best turbines layout found: {best_layout}")
+        print(f'Generation of best result {best_result_generation}')
+        print('-' * 40)
+
+    return ((best_fitness, best_layout),
+            (solutions_max_fitness_values, solutions_layouts),
+            solutions_avg_fitness_values)
+
+
+def genetic_algorithm(ga_config, migrate=None, on_generation=None, observers=()):
+    """Run the genetic algorithm, evolve or with ga_config['asynchronous'] set evolve_asynchronous.
+    on_generation(stats) and the on_generation method of every observer (instrumentation.Observer) are called with
+    the stats of every generation, the observers' on_finish with the result. With ga_config['profile'] set to a
+    path the run is profiled with cProfile and the stats are dumped there."""
+    with profiling(ga_config.get('profile')):
+        if ga_config.get('asynchronous'):
+            if migrate is not None:
+                raise ValueError("The asynchronous steady-state mode does not support migration.")
+            generations = evolve_asynchronous(ga_config)
+        else:
+            generations = evolve(ga_config, migrate)
+        while True:
+            try:
+                stats = next(generations)
+            except StopIteration as stop:
+                result = stop.value
+                break
+            if on_generation is not None:
+                on_generation(stats)
+            for observer in observers:
+                observer.on_generation(stats)
+    for observer in observers:
+        observer.on_finish(result)
+    return result
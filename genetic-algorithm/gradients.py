@@ -0,0 +1,120 @@
+"""Analytic gradients of the fitness with respect to the turbine coordinates.
+
+All functions take decoded layouts of shape (pop, n_turbines, 2) and return a value per layout together with its
+gradient of the same shape as the positions. The Jensen deficits are smooth in the distances, the only kinks are
+the min(1, deficit) clamp, the edges of the power curve and, for the wind rose, the edges of the wake cones,
+where the gradient is that of the side the layout is on. Every gradient costs about one fitness evaluation,
+against 2 * n_turbines evaluations for central finite differences.
+"""
+import numpy as np
+from fitness import ROTOR_RADIUS, K_W, energy_from_wake_deficit
+from power_curve import DEFAULT_POWER_CURVE
+from spatial import close_pairs_batch
+from wake_sweep import WAKE_DEFICIT
+
+
+def _deficit_slope(distances):
+    """Derivative of the single wake deficit (1 - sqrt(1 - C_T)) * (r / (k_w * d + r))**2 over the distance d."""
+    return -2 * WAKE_DEFICIT * K_W * ROTOR_RADIUS ** 2 / (K_W * distances + ROTOR_RADIUS) ** 3
+
+
+def _power_slope(wake_deficit, wind_speed, power_curve):
+    """Derivative of the power of every turbine over its summed wake deficit."""
+    power_curve = power_curve or DEFAULT_POWER_CURVE
+    effective_wind_speed = wind_speed * (1 - np.minimum(1, wake_deficit))
+    return np.where(wake_deficit < 1, -wind_speed * power_curve.derivative(effective_wind_speed), 0.0)
+
+
+def energy_gradient(positions, wind_speed, power_curve=None):
+    """Energy production of the all pairs model of calculate_layout_energy_production and evaluate_fitness_batch,
+    and its gradient. The deficit of a pair enters the wake of both turbines, so turbine i gets
+    (g_i + g_j) * t'(d_ij) * (p_i - p_j) / d_ij from every other turbine j, g being the power slope above."""
+    positions = np.asarray(positions, dtype=float)
+    diff = positions[:, :, np.newaxis, :] - positions[:, np.newaxis, :, :]
+    distances = np.sqrt((diff ** 2).sum(axis=-1))
+    coincident = distances == 0
+    wake_terms = np.where(coincident, 0.0, WAKE_DEFICIT * (ROTOR_RADIUS / (K_W * distances + ROTOR_RADIUS)) ** 2)
+    wake_deficit = wake_terms.sum(axis=-1)
+
+    power_slope = _power_slope(wake_deficit, wind_speed, power_curve)
+    pair_slope = (power_slope[:, :, np.newaxis] + power_slope[:, np.newaxis, :]) * _deficit_slope(distances)
+    pair_slope = np.where(coincident, 0.0, pair_slope / np.where(coincident, 1.0, distances))
+    gradient = (pair_slope[..., np.newaxis] * diff).sum(axis=2)
+    return energy_from_wake_deficit(wake_deficit, wind_speed, power_curve), gradient
+
+
+def energy_gradient_wind_rose(positions, wind_speed, wind_rose, power_curve=None):
+    """Energy production of the directional model of evaluate_fitness_wind_rose and its gradient. A waked pair only
+    depends on the downstream distance, so in every sector the downstream turbine is pulled along the flow and the
+    upstream one against it."""
+    positions = np.asarray(positions, dtype=float)
+    diff = positions[:, :, np.newaxis, :] - positions[:, np.newaxis, :, :]
+    downstream = np.einsum('pijk,sk->spij', diff, wind_rose.flow)
+    crosswind = np.einsum('pijk,sk->spij', diff, wind_rose.normal)
+    wake_radius = ROTOR_RADIUS + K_W * downstream
+    waked = (downstream > 0) & (np.abs(crosswind) < wake_radius)
+    safe_radius = np.where(waked, wake_radius, ROTOR_RADIUS)
+    wake_deficit = np.where(waked, WAKE_DEFICIT * (ROTOR_RADIUS / safe_radius) ** 2, 0.0).sum(axis=-1)
+    deficit_slope = np.where(waked, -2 * WAKE_DEFICIT * K_W * ROTOR_RADIUS ** 2 / safe_radius ** 3, 0.0)
+
+    power_slope = _power_slope(wake_deficit, wind_speed, power_curve)
+    # slope of every sector's energy along its flow, for moving turbine i downstream (axis -2) or upstream (axis -1)
+    pair_slope = power_slope[..., np.newaxis] * deficit_slope
+    flow_slope = pair_slope.sum(axis=-1) - pair_slope.sum(axis=-2)
+    gradient = np.einsum('s,spi,sk->pik', wind_rose.frequencies, flow_slope, wind_rose.flow)
+    energy_production = wind_rose.mean(energy_from_wake_deficit(wake_deficit, wind_speed, power_curve))
+    return energy_production, gradient
+
+
+def spacing_gradient(positions, min_spacing):
+    """Spacing fitness of fitness_uniform_spacing, minus the sum of (min_spacing - d)**2 over the pairs closer
+    than min_spacing, and its gradient. The pairs come from close_pairs_batch."""
+    positions = np.asarray(positions, dtype=float)
+    population_size, n_turbines = positions.shape[:2]
+    flat_positions = positions.reshape(-1, 2)
+    first, second, distances = close_pairs_batch(positions, min_spacing)
+    shortfall = min_spacing - distances
+    spacing_fitness = -np.bincount(first // n_turbines, weights=shortfall ** 2, minlength=population_size)
+    # turbines on the same spot get no direction to separate in
+    pair_slope = np.where(distances > 0, 2 * shortfall / np.where(distances > 0, distances, 1.0), 0.0)
+    pushes = pair_slope[:, np.newaxis] * (flat_positions[first] - flat_positions[second])
+    gradient = np.stack([np.bincount(first, weights=pushes[:, axis], minlength=len(flat_positions)) -
+                         np.bincount(second, weights=pushes[:, axis], minlength=len(flat_positions))
+                         for axis in range(2)], axis=-1)
+    return spacing_fitness, gradient.reshape(positions.shape)
+
+
+def boundary_gradient(positions, area_size):
+    """Smooth stand-in for the boundary fitness, which counts the turbines outside [0, area_size) and so has a zero
+    gradient wherever it is defined: minus the squared distance of every turbine outside [0, area_size - 1] to the
+    site, and its gradient."""
+    positions = np.asarray(positions, dtype=float)
+    excess = positions - np.clip(positions, 0, area_size - 1)
+    return -(excess ** 2).sum(axis=(1, 2)), -2 * excess
+
+
+def fitness_gradient(positions, weights, area_size, min_spacing, wind_speed, wind_rose=None, power_curve=None):
+    """Smooth part of the fitness of combine_fitness_terms and its gradient: the weighted energy production,
+    spacing fitness and boundary stand-in, with the weights paired with the terms as there. The is_valid penalty
+    is a step and left out."""
+    if wind_rose is None:
+        energy_production, energy = energy_gradient(positions, wind_speed, power_curve)
+    else:
+        energy_production, energy = energy_gradient_wind_rose(positions, wind_speed, wind_rose, power_curve)
+    spacing_fitness, spacing = spacing_gradient(positions, min_spacing)
+    boundary_fitness, boundary = boundary_gradient(positions, area_size)
+    value = (weights['energy_production'] * energy_production +
+             weights['boundary_fitness'] * spacing_fitness +
+             weights['spacing_fitness'] * boundary_fitness)
+    gradient = (weights['energy_production'] * energy +
+                weights['boundary_fitness'] * spacing +
+                weights['spacing_fitness'] * boundary)
+    return value, gradient
+
+
+def minimize_objective(x, weights, area_size, min_spacing, wind_speed, wind_rose=None, power_curve=None):
+    """Negated fitness_gradient of a flat layout [x0, y0, x1, y1, ...], for
+    scipy.optimize.minimize(minimize_objective, x0, args=(...), jac=True) in place of finite differences."""
+    value, gradient = fitness_gradient(np.asarray(x, dtype=float).reshape(1, -1, 2), weights, area_size, min_spacing,
+                                       wind_speed, wind_rose, power_curve)
+    return -float(value[0]), -gradient.ravel()
@@ -0,0 +1,102 @@
+import contextlib
+import json
+
+
+def _line_offsets(file):
+    """Byte offset of every complete line of file, read from the current position. A torn last line, left by a run
+    killed while writing it, is not a line."""
+    offsets = []
+    offset = file.tell()
+    for line in iter(file.readline, b''):
+        if not line.endswith(b'\n'):
+            break
+        offsets.append(offset)
+        offset += len(line)
+    return offsets
+
+
+class HistoryWriter:
+    """Append-only JSON lines file with the stats of one generation per line.
+
+    Every line is flushed as it is written, so the file can be read while the run is going on. Opened with
+    start_generation > 0 (a resumed run), lines of generation start_generation and later, and a torn last line, are
+    dropped first; a missing file is created."""
+
+    def __init__(self, path, start_generation=0):
+        self.path = path
+        if not start_generation:
+            self._file = open(path, 'wb')
+            return
+        self._file = open(path, 'a+b')
+        self._file.seek(0)
+        end = 0
+        for offset in _line_offsets(self._file):
+            self._file.seek(offset)
+            line = self._file.readline()
+            if json.loads(line)['generation'] >= start_generation:
+                break
+            end = offset + len(line)
+        self._file.truncate(end)
+
+    def write(self, stats):
+        self._file.write(json.dumps(stats).encode() + b'\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def open_history(path, start_generation=0):
+    """HistoryWriter for path, or a context yielding None when path is not set."""
+    return HistoryWriter(path, start_generation) if path else contextlib.nullcontext()
+
+
+class HistoryReader:
+    """Lazy reader of a history file. The line offsets are indexed once, generations are only parsed when accessed.
+
+        history = HistoryReader('history.jsonl')
+        plot_multiple_layouts(history.layouts(slice(None, None, 10)), alpha_ascending=True)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._offsets = _line_offsets(file)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, generations):
+        """Stats of one generation (an index) or a list of them (a slice or a sequence of indices)."""
+        if isinstance(generations, int):
+            return self._read([generations])[0]
+        return self._read(self._indices(generations))
+
+    def _indices(self, generations):
+        if generations is None:
+            return range(len(self))
+        if isinstance(generations, slice):
+            return range(*generations.indices(len(self)))
+        return generations
+
+    def _read(self, indices):
+        with open(self.path, 'rb') as file:
+            stats = []
+            for index in indices:
+                file.seek(self._offsets[index])
+                stats.append(json.loads(file.readline()))
+        return stats
+
+    def column(self, name, generations=None):
+        """Values of one stat, e.g. 'max_fitness', for the selected generations (all by default)."""
+        return [stats[name] for stats in self._read(self._indices(generations))]
+
+    def layouts(self, generations=None):
+        """Best layouts of the selected generations as lists of (x, y) tuples."""
+        return [[tuple(position) for position in layout] for layout in self.column('best_layout', generations)]
@@ -0,0 +1,156 @@
+import numpy as np
+from fitness import pair_terms, energy_from_wake_deficit, boundary_terms, combine_fitness_terms
+from utils import decode_population
+
+
+def layout_state(positions, min_spacing):
+    """Per-layout state for positions of shape (pop, n_turbines, 2): summed wake deficit at every turbine,
+    total spacing penalty and number of pairs closer than min_spacing."""
+    positions = np.asarray(positions, dtype=float)
+    wake_terms, spacing_terms, too_close = pair_terms(positions[:, :, np.newaxis, :], positions[:, np.newaxis, :, :],
+                                                      min_spacing)
+    # diagonal terms are zero for the wake and (min_spacing - 0)**2 for spacing, every other pair is counted twice
+    n_turbines = positions.shape[1]
+    self_close = int(min_spacing > 0)
+    spacing_penalty = (spacing_terms.sum(axis=(1, 2)) - n_turbines * self_close * min_spacing ** 2) / 2
+    close_pairs = (too_close.sum(axis=(1, 2)) - n_turbines * self_close) // 2
+    return wake_terms.sum(axis=-1), spacing_penalty, close_pairs
+
+
+def update_layout_state(base_positions, base_state, positions, min_spacing):
+    """Update the state of base layouts into the state of positions that differ from them in a few turbines.
+
+    Only pairs touching a moved turbine are recomputed, so for k moved turbines out of n the cost is O(k*n)
+    per layout instead of O(n^2). Layouts are padded to the largest number of moved turbines in the batch."""
+    base_positions = np.asarray(base_positions, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    base_wake, base_spacing, base_close = base_state
+    population_size, n_turbines = positions.shape[:2]
+
+    moved = (positions != base_positions).any(axis=-1)
+    n_moved = moved.sum(axis=-1)
+    max_moved = int(n_moved.max(initial=0))
+    if not max_moved:
+        return base_wake.copy(), base_spacing.copy(), base_close.copy()
+
+    # indices of moved turbines first, padded with unmoved ones that are masked out by is_moved
+    order = np.argsort(~moved, axis=-1, kind='stable')[:, :max_moved]
+    is_moved = np.arange(max_moved) < n_moved[:, np.newaxis]
+    layout_idx = np.arange(population_size)[:, np.newaxis]
+    self_close = int(min_spacing > 0)
+
+    def touching_terms(layout_positions):
+        moved_positions = layout_positions[layout_idx, order]
+        wake_terms, spacing_terms, too_close = pair_terms(moved_positions[:, :, np.newaxis, :],
+                                                          layout_positions[:, np.newaxis, :, :], min_spacing)
+        wake_terms = wake_terms * is_moved[..., np.newaxis]
+        spacing_terms = spacing_terms * is_moved[..., np.newaxis]
+        too_close = too_close & is_moved[..., np.newaxis]
+        # pairs between two moved turbines appear twice and self pairs once
+        within_moved = moved[:, np.newaxis, :]
+        spacing_penalty = (spacing_terms.sum(axis=(1, 2)) - 0.5 * (spacing_terms * within_moved).sum(axis=(1, 2))
+                           - 0.5 * n_moved * self_close * min_spacing ** 2)
+        close_pairs = (too_close.sum(axis=(1, 2)) - 0.5 * (too_close & within_moved).sum(axis=(1, 2))
+                       - 0.5 * n_moved * self_close)
+        return wake_terms, spacing_penalty, close_pairs
+
+    old_wake_terms, old_spacing, old_close = touching_terms(base_positions)
+    new_wake_terms, new_spacing, new_close = touching_terms(positions)
+
+    wake = base_wake - old_wake_terms.sum(axis=1) + new_wake_terms.sum(axis=1)
+    moved_wake = new_wake_terms.sum(axis=-1)
+    wake[layout_idx, order] = np.where(is_moved, moved_wake, wake[layout_idx, order])
+    spacing_penalty = base_spacing - old_spacing + new_spacing
+    close_pairs = np.rint(base_close - old_close + new_close).astype(int)
+    return wake, spacing_penalty, close_pairs
+
+
+class IncrementalFitness:
+    """Fitness evaluator that keeps a state per known layout and evaluates children from a parent's state.
+
+    The state (wake deficit per turbine, spacing penalty, number of too close pairs) is O(n_turbines) per layout
+    rather than a full pairwise matrix; moving k turbines updates it in O(k*n_turbines), so mutated copies of a parent
+    are cheap while crossover children only gain when the cut is near an end. Children that differ from every
+    candidate parent in more than max_moved_fraction of their turbines are evaluated from scratch.
+    Values match evaluate_fitness_batch up to floating point round-off."""
+
+    def __init__(self, weights, area_size, min_spacing, wind_speed, wind_direction, power_curve=None,
+                 max_moved_fraction=0.25):
+        self.weights = weights
+        self.area_size = area_size
+        self.min_spacing = min_spacing
+        self.wind_speed = wind_speed
+        self.wind_direction = wind_direction
+        self.power_curve = power_curve
+        self.max_moved_fraction = max_moved_fraction
+        self.states = {}
+        self.full_evaluations = 0
+        self.incremental_evaluations = 0
+
+    def _fitness(self, positions, state):
+        wake, spacing_penalty, close_pairs = state
+        energy_production = energy_from_wake_deficit(wake, self.wind_speed, self.power_curve)
+        boundary_fitness, within_bounds = boundary_terms(positions, self.area_size)
+        return combine_fitness_terms(self.weights, energy_production, boundary_fitness, -spacing_penalty,
+                                     within_bounds & (close_pairs == 0))
+
+    def _store(self, positions, state):
+        for layout, wake, spacing_penalty, close_pairs in zip(positions, *state):
+            self.states[layout.tobytes()] = (wake, spacing_penalty, close_pairs)
+
+    def evaluate(self, population):
+        """Evaluate a population from scratch and remember the state of each layout."""
+        positions = decode_population(population).astype(float)
+        state = layout_state(positions, self.min_spacing)
+        self._store(positions, state)
+        self.full_evaluations += len(positions)
+        return self._fitness(positions, state)
+
+    def evaluate_offspring(self, offspring, parents):
+        """Evaluate offspring incrementally from the closest of their candidate parents.
+
+        Following the crossover operators, child j is compared with parents 2*(j//2) and 2*(j//2)+1 (pairwise
+        operators) and with parent j//2 (operators breeding two children per parent)."""
+        positions = decode_population(offspring).astype(float)
+        parent_positions = decode_population(parents).astype(float)
+        population_size, n_turbines = positions.shape[:2]
+
+        child_idx = np.arange(population_size)
+        candidates = np.stack([2 * (child_idx // 2), 2 * (child_idx // 2) + 1, child_idx // 2], axis=-1)
+        candidates = np.minimum(candidates, len(parent_positions) - 1)
+        differences = (positions[:, np.newaxis] != parent_positions[candidates]).any(axis=-1).sum(axis=-1)
+        known = np.array([[parent_positions[c].tobytes() in self.states for c in row] for row in candidates])
+        differences = np.where(known, differences, n_turbines + 1)
+        best_candidate = candidates[child_idx, differences.argmin(axis=-1)]
+        incremental = differences.min(axis=-1) <= self.max_moved_fraction * n_turbines
+
+        fitness_values = np.empty(population_size)
+        # children are grouped by the bit length of their number of moved turbines to limit padding
+        moved_groups = np.where(incremental, np.frexp(differences.min(axis=-1))[1], -1)
+        for group in np.unique(moved_groups[incremental]):
+            selected = moved_groups == group
+            base_positions = parent_positions[best_candidate[selected]]
+            base_states = [self.states[layout.tobytes()] for layout in base_positions]
+            base_state = tuple(np.array(values) for values in zip(*base_states))
+            state = update_layout_state(base_positions, base_state, positions[selected], self.min_spacing)
+            self._store(positions[selected], state)
+            fitness_values[selected] = self._fitness(positions[selected], state)
+        self.incremental_evaluations += int(incremental.sum())
+        if not incremental.all():
+            fitness_values[~incremental] = self.evaluate(positions[~incremental])
+        return fitness_values
+
+    def retain(self, population):
+        """Forget the state of every layout not in population."""
+        keep = {layout.tobytes() for layout in decode_population(population).astype(float)}
+        self.states = {key: state for key, state in self.states.items() if key in keep}
+
+    def population_state(self, population):
+        """Stored state of every layout in population as (wake, spacing_penalty, close_pairs) arrays."""
+        states = [self.states[layout.tobytes()] for layout in decode_population(population).astype(float)]
+        return tuple(np.array(values) for values in zip(*states))
+
+    def restore(self, population, state):
+        """Set the state of the layouts in population, as returned by population_state, e.g. from a checkpoint."""
+        self.states = {}
+        self._store(decode_population(population).astype(float), state)
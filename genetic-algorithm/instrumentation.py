@@ -0,0 +1,103 @@
+import contextlib
+import cProfile
+import sys
+import time
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def peak_memory():
+    """Peak resident set size of the process in bytes, None where the resource module is not available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class StageTimer:
+    """Accumulates the wall time of the stages of one generation.
+
+        with timer('selection'):
+            selected_parents = selection(population, fitness_values)
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self._stage = None
+        self._start = None
+
+    def __call__(self, stage):
+        self._stage = stage
+        return self
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.timings[self._stage] = self.timings.get(self._stage, 0.0) + time.perf_counter() - self._start
+
+
+class Observer:
+    """Base class of the observers passed to genetic_algorithm. on_generation(stats) is called with the stats
+    of every generation (see genetic_algorithm.evolve) and on_finish(result) with the returned tuple."""
+
+    def on_generation(self, stats):
+        pass
+
+    def on_finish(self, result):
+        pass
+
+
+class StageTimes(Observer):
+    """Totals of the per-stage wall time, fitness evaluations and cache use over a run."""
+
+    def __init__(self):
+        self.timings = {}
+        self.generations = 0
+        self.evaluations = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.peak_memory_bytes = None
+
+    def on_generation(self, stats):
+        self.generations += 1
+        for stage, seconds in stats['timings'].items():
+            self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+        self.evaluations += stats['evaluations']
+        self.cache_hits += stats.get('cache_hits', 0)
+        self.cache_misses += stats.get('cache_misses', 0)
+        self.peak_memory_bytes = stats['peak_memory_bytes']
+
+    def summary(self):
+        """Table of the total time, share and time per generation of every stage."""
+        total = sum(self.timings.values())
+        lines = [f"{'stage':<12} {'total s':>10} {'share':>7} {'ms/gen':>10}"]
+        for stage, seconds in sorted(self.timings.items(), key=lambda item: -item[1]):
+            lines.append(f"{stage:<12} {seconds:10.3f} {seconds / total if total else 0:7.1%} "
+                         f"{seconds / max(1, self.generations) * 1e3:10.2f}")
+        evaluate_seconds = self.timings.get('evaluate', 0.0)
+        lines.append(f"{self.evaluations} evaluations"
+                     + (f", {self.evaluations / evaluate_seconds:.0f} per second" if evaluate_seconds else ''))
+        if self.cache_hits or self.cache_misses:
+            lines.append(f"fitness cache: {self.cache_hits} hits, {self.cache_misses} misses")
+        if self.peak_memory_bytes is not None:
+            lines.append(f"peak memory: {self.peak_memory_bytes / 2**20:.1f} MiB")
+        return '\n'.join(lines)
+
+
+@contextlib.contextmanager
+def profiling(path=None):
+    """Run the block under cProfile when path is set and dump the stats to path, to be read with pstats.
+    Only the calling process is profiled, not the fitness pool workers."""
+    if not path:
+        yield None
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
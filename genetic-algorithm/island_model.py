@@ -0,0 +1,114 @@
+import multiprocessing
+import queue
+import random
+import numpy as np
+from genetic_algorithm import genetic_algorithm
+
+
+def migration_targets(island, n_islands, topology):
+    """Islands receiving the migrants of island in a 'ring' or 'fully_connected' topology."""
+    if topology == 'ring':
+        return [(island + 1) % n_islands] if n_islands > 1 else []
+    if topology == 'fully_connected':
+        return [other for other in range(n_islands) if other != island]
+    raise ValueError(f"Unknown migration topology: {topology}")
+
+
+def migration_sources(island, n_islands, topology):
+    return [other for other in range(n_islands) if island in migration_targets(other, n_islands, topology)]
+
+
+def _island_worker(island, ga_config, seed, inboxes, results):
+    random.seed(seed)
+    np.random.seed(seed)
+
+    n_islands = len(inboxes)
+    topology = ga_config.get('migration_topology', 'ring')
+    migration_interval = ga_config.get('migration_interval', 5)
+    n_migrants = ga_config.get('n_migrants', 2)
+    targets = migration_targets(island, n_islands, topology)
+    n_sources = len(migration_sources(island, n_islands, topology))
+    # messages of later migrations that arrived early, keyed by generation
+    pending = {}
+
+    def migrate(generation, population, fitness_values):
+        if (generation + 1) % migration_interval:
+            return population, fitness_values
+
+        best = np.argsort(-fitness_values, kind='stable')[:n_migrants]
+        for target in targets:
+            inboxes[target].put((generation, island, population[best], fitness_values[best]))
+
+        received = pending.pop(generation, [])
+        while len(received) < n_sources:
+            message = inboxes[island].get()
+            if message[0] == generation:
+                received.append(message)
+            else:
+                pending.setdefault(message[0], []).append(message)
+
+        # migrants replace the worst individuals, in order of their source island for determinism
+        received.sort(key=lambda message: message[1])
+        migrants = np.concatenate([message[2] for message in received])
+        migrants_fitness = np.concatenate([message[3] for message in received])
+        worst = np.argsort(fitness_values, kind='stable')[:len(migrants)]
+        population, fitness_values = population.copy(), fitness_values.copy()
+        population[worst] = migrants[:len(worst)]
+        fitness_values[worst] = migrants_fitness[:len(worst)]
+        return population, fitness_values
+
+    results.put((island, genetic_algorithm(ga_config, migrate=migrate)))
+
+
+def island_model(ga_config):
+    """Run the genetic algorithm on ga_config['n_islands'] subpopulations in parallel processes.
+
+    Every migration_interval generations each island sends its n_migrants best individuals (with their fitness)
+    to its neighbours in the migration_topology ('ring' or 'fully_connected'), where they replace the worst.
+    Migrations are synchronous, so islands run for max_generations without stopping on stagnation.
+    Island i is seeded with ga_config['seed'] + i. Returns the same tuple as genetic_algorithm: the best result
+    over all islands, the per-generation maximum with the matching layout and the mean of the island averages."""
+    n_islands = ga_config.get('n_islands', 4)
+    if ga_config.get('checkpoint_path') or ga_config.get('resume_from'):
+        raise ValueError("Checkpoints are not supported by the island model.")
+    if ga_config.get('history_path'):
+        raise ValueError("history_path is not supported by the island model, use the returned history instead.")
+    seed = ga_config.get('seed')
+    if seed is None:
+        seed = random.randrange(2**32 - n_islands)
+    island_config = dict(ga_config, max_stagnation=ga_config['max_generations'] + 1)
+
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in range(n_islands)]
+    results = context.Queue()
+    workers = [context.Process(target=_island_worker, args=(island, island_config, seed + island, inboxes, results))
+               for island in range(n_islands)]
+    for worker in workers:
+        worker.start()
+    island_results = {}
+    while len(island_results) < n_islands:
+        try:
+            island, result = results.get(timeout=1)
+            island_results[island] = result
+        except queue.Empty:
+            if any(worker.exitcode not in (None, 0) for worker in workers):
+                for worker in workers:
+                    worker.terminate()
+                raise RuntimeError("An island process failed.")
+    for worker in workers:
+        worker.join()
+
+    island_results = [island_results[island] for island in range(n_islands)]
+    (best_fitness, best_layout), _, _ = max(island_results, key=lambda result: result[0][0])
+
+    solutions_max_fitness_values, solutions_layouts, solutions_avg_fitness_values = [], [], []
+    for generation in range(min(len(result[2]) for result in island_results)):
+        max_fitness, layout = max(((result[1][0][generation], result[1][1][generation]) for result in island_results),
+                                  key=lambda value: value[0])
+        solutions_max_fitness_values.append(max_fitness)
+        solutions_layouts.append(layout)
+        solutions_avg_fitness_values.append(float(np.mean([result[2][generation] for result in island_results])))
+
+    return ((best_fitness, best_layout),
+            (solutions_max_fitness_values, solutions_layouts),
+            solutions_avg_fitness_values)
@@ -0,0 +1,33 @@
+import numpy as np
+
+
+def gradient_refine(positions, fitness_values, evaluate, gradient, area_size, steps=3, step_size=10.0):
+    """Refine integer layouts of shape (k, n_turbines, 2) by projected gradient ascent.
+
+    Every step moves each layout along gradient(positions), scaled so its fastest turbine moves step_size meters,
+    rounds the move to the grid and clamps it into [0, area_size - 1]. The moved layouts are evaluated with
+    evaluate(positions) -> fitness vector and a move is only kept if it improves the fitness; a rejected move
+    halves the step of that layout, which drops out once its step is below the grid spacing.
+    Returns the refined positions, their fitness and the number of evaluations."""
+    positions = np.array(positions, dtype=float)
+    fitness_values = np.array(fitness_values, dtype=float)
+    step_sizes = np.full(len(positions), float(step_size))
+    evaluations = 0
+    for _ in range(steps):
+        active = np.flatnonzero(step_sizes >= 1)
+        if not len(active):
+            break
+        directions = gradient(positions[active])
+        fastest = np.sqrt((directions ** 2).sum(axis=-1)).max(axis=-1)
+        scale = np.where(fastest > 0, step_sizes[active] / np.where(fastest > 0, fastest, 1.0), 0.0)
+        candidates = np.clip(np.rint(positions[active] + scale[:, np.newaxis, np.newaxis] * directions),
+                             0, area_size - 1)
+        candidate_fitness = np.asarray(evaluate(candidates.astype(int)), dtype=float)
+        evaluations += len(candidates)
+
+        improved = candidate_fitness > fitness_values[active]
+        positions[active[improved]] = candidates[improved]
+        fitness_values[active[improved]] = candidate_fitness[improved]
+        step_sizes[active[~improved]] /= 2
+        step_sizes[active[fastest == 0]] = 0
+    return positions.astype(int), fitness_values, evaluations
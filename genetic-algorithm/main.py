@@ -1,4 +1,6 @@
 from genetic_algorithm import *
+from island_model import island_model
+from history import HistoryReader
 from plotting import *
 from fitness import fitness_max_energy_production
 
@@ -9,6 +11,11 @@ area_size = 300
 min_spacing = 50
 wind_speed = 9.8
 wind_direction = 270.0
+wind_rose = None  # path of a wind rose csv, e.g. wind_rose.WIND_ROSE_PATH, to optimize over all its sectors
+wake_tolerance = None  # e.g. 1e-3, directional wake model ignoring deficits below it, for large farms
+offset_tables = False  # gather the pair terms from lookup tables on the integer site grid, cached on disk
+fitness_backend = None  # a backends.FitnessBackend replacing the built-in wake model, e.g. a WakeSimulatorBackend
+power_curve = None  # path of a csv with wind_speed [m/s] and power [MW] columns replacing the default power curve
 fitness_weights = {
     'energy_production': 0.5,
     'boundary_fitness': 0.2,
@@ -23,6 +30,36 @@ max_generations = 100
 population_size = 100
 max_stagnation = 10
 mutation_rate = 0.01
+n_workers = 1  # processes used for fitness evaluation, or the workers of an executor passed as ga_config['executor']
+asynchronous = False  # steady-state evolution without generation barriers, keeps the workers busy
+async_batch_size = None  # children per asynchronous task, by default population_size / (2 * n_workers)
+max_evaluations = None  # children evaluated by an asynchronous run, by default as many as max_generations breed
+stagnation_interval = None  # evaluations counted as an asynchronous generation, by default population_size
+fitness_cache_size = 10000  # layouts kept in the fitness cache, 0 disables it
+incremental_fitness = False  # evaluate offspring from their parents' state, pays off for large farms
+repair = False  # clamp offspring into the site and push apart too close turbines before they are evaluated
+repair_iterations = 40  # rounds of pushing apart too close turbines
+memetic_top_k = 0  # refine the best individuals of every generation with a few analytic gradient steps
+memetic_steps = 3  # gradient steps per refined individual
+memetic_step_size = 10.0  # largest move of a turbine per gradient step [m]
+surrogate = False  # pre-screen offspring with a k-NN surrogate, only the most promising are evaluated exactly
+surrogate_budget = 0.5  # fraction of the offspring evaluated exactly per generation
+surrogate_exploration = 0.1  # fraction of that budget spent on offspring picked at random
+checkpoint_path = None  # .npz file the run state is saved to every checkpoint_interval generations
+checkpoint_interval = 10
+resume_from = None  # checkpoint to continue an interrupted run from, exactly as it would have gone on
+verbose = True  # per-generation progress prints
+profile = None  # path to dump cProfile stats of every run to, e.g. 'ga.prof'
+history_path = None  # e.g. 'history_{run}.jsonl' streams the generations of every run to a file instead of memory
+# set in ga_config by callers: 'executor' (a concurrent.futures executor evaluating the fitness, with n_workers its
+# number of workers), 'initial_population' (a genome array) and 'initial_fitness_values' (its fitness) shared by
+# several runs, and 'seed' (island i is seeded with seed + i)
+
+# ISLAND MODEL SETTINGS (used when n_islands > 1)
+n_islands = 1
+migration_interval = 5
+n_migrants = 2
+migration_topology = 'ring'  # or 'fully_connected'
 
 ga_config = {
     'n_turbines': n_turbines,
@@ -30,11 +67,41 @@ ga_config = {
     'min_spacing': min_spacing,
     'wind_speed': wind_speed,
     'wind_direction': wind_direction,
+    'wind_rose': wind_rose,
+    'power_curve': power_curve,
+    'fitness_backend': fitness_backend,
+    'wake_tolerance': wake_tolerance,
+    'offset_tables': offset_tables,
     'fitness_weights': fitness_weights,
     'population_size': population_size,
     'max_generations': max_generations,
     'max_stagnation': max_stagnation,
     'mutation_rate': mutation_rate,
+    'n_workers': n_workers,
+    'asynchronous': asynchronous,
+    'async_batch_size': async_batch_size,
+    'max_evaluations': max_evaluations,
+    'stagnation_interval': stagnation_interval,
+    'fitness_cache_size': fitness_cache_size,
+    'incremental_fitness': incremental_fitness,
+    'repair': repair,
+    'repair_iterations': repair_iterations,
+    'memetic_top_k': memetic_top_k,
+    'memetic_steps': memetic_steps,
+    'memetic_step_size': memetic_step_size,
+    'surrogate': surrogate,
+    'surrogate_budget': surrogate_budget,
+    'surrogate_exploration': surrogate_exploration,
+    'checkpoint_path': checkpoint_path,
+    'checkpoint_interval': checkpoint_interval,
+    'resume_from': resume_from,
+    'keep_history': history_path is None,
+    'verbose': verbose,
+    'profile': profile,
+    'n_islands': n_islands,
+    'migration_interval': migration_interval,
+    'n_migrants': n_migrants,
+    'migration_topology': migration_topology,
 
 }
 
@@ -47,7 +114,12 @@ if __name__ == '__main__':
     solutions_layouts = []
     for i in range(10):
         print(f"ITERATION {i+1}")
-        (best_fitness, best_layout), (fitness_max_values, layouts), fitness_avg_values = genetic_algorithm(ga_config)
+        run = island_model if n_islands > 1 else genetic_algorithm
+        run_config = dict(ga_config, history_path=history_path.format(run=i + 1)) if history_path else ga_config
+        (best_fitness, best_layout), (fitness_max_values, layouts), fitness_avg_values = run(run_config)
+        if history_path:
+            layouts = HistoryReader(run_config['history_path'])
+            fitness_max_values, fitness_avg_values = layouts.column('max_fitness'), layouts.column('avg_fitness')
         solutions_best_fitness_values.append([i+1, best_fitness])
         solutions_best_layouts.append(best_layout)
         solutions_max_fitness_values.append(fitness_max_values)
@@ -56,7 +128,8 @@ if __name__ == '__main__':
 
     plot_multiple_layouts(solutions_best_layouts, title=f'Best turbine layouts')
     # for i, layouts in enumerate(solutions_layouts):
-    #     plot_multiple_layouts(layouts[::10], title=f'Turbine layouts {i + 1}', alpha_ascending=True)
+    #     layouts = layouts.layouts(slice(None, None, 10)) if history_path else layouts[::10]
+    #     plot_multiple_layouts(layouts, title=f'Turbine layouts {i + 1}', alpha_ascending=True)
 
     global_best_solution = fitness_max_energy_production(solutions_best_layouts[0], fitness_weights, wind_speed)
     plot_solutions_data_stats(solutions_max_fitness_values,
@@ -1,77 +1,125 @@
-import random
-
-
-def bit_mutation(chromosome, mutation_factor):
-    chromosome_length = len(chromosome) - 1
-    for step in range(mutation_factor):
-        random_gene = random.randint(0, chromosome_length)
-        mutated_gene = '0' if chromosome[random_gene] else '1'
-        chromosome = chromosome[:random_gene] + mutated_gene + chromosome[random_gene + 1:]
-    return chromosome
-
-
-def mutation_n_times_each_chromosome(offspring, mutation_rate, verbose=False):
-    """Perform mutation on offspring individuals with a given mutation rate."""
-    mutated_offspring = []
-    for layout in offspring:
-        mutated_layout = []
-        for chromosome in layout:
-            mutated_chromosome = bit_mutation(chromosome, int(mutation_rate * 10))
-            mutated_layout.append(mutated_chromosome)
-        mutated_offspring.append(mutated_layout)
-    return mutated_offspring
-
-
-def mutation_each_chromosome(offspring, mutation_rate, verbose=False):
-    mutated_offspring = []
-    mutation_counter = [0]
-
-    for layout in offspring:
-        mutated_layout = []
-        for chromosome in layout:
-            if random.random() < mutation_rate:
-                random_gene = random.randint(0, len(chromosome)-1)
-                mutated_gene = '0' if chromosome[random_gene] else '1'
-                chromosome = chromosome[:random_gene] + mutated_gene + chromosome[random_gene + 1:]
-                mutation_counter[-1] += 1
-            mutated_layout.append(chromosome)
-            mutation_counter.append(0)
-        mutated_offspring.append(mutated_layout)
-
-        if verbose:
-            print('mutation_counter:', sum(mutation_counter)/(len(mutation_counter)-1))
-    return mutated_offspring
-
-
-def mutation_concatenated_layout(offspring, mutation_rate, verbose=False):
-    """Perform mutation on offspring individuals with a given mutation rate."""
-    mutation_counter = 0
-
-    mutated_offspring_concatenated = []
-    num_bits = len(offspring[0][0])
-    offspring_concatenated = [''.join(layout) for layout in offspring]
-    for layout in offspring_concatenated:
-        mutated_layout = ''
-        for gene in layout:
-            if random.random() < mutation_rate:
-                mutated_gene = '0' if gene == '1' else '1'
-                mutation_counter += 1
-            else:
-                mutated_gene = gene
-            mutated_layout += mutated_gene
-        mutated_offspring_concatenated.append(mutated_layout)
-
-    mutated_offspring = []
-    for mutated_layout in mutated_offspring_concatenated:
-        layout = []
-        for i in range(len(offspring[0])):
-            layout.append(mutated_layout[i:i+num_bits])
-        mutated_offspring.append(layout)
+import functools
+import math
+import numpy as np
+from utils import genome_to_population, population_to_genome
 
+
+def _require_num_bits(num_bits):
+    if num_bits is None:
+        raise ValueError("num_bits is required to mutate a genome array.")
+
+
+def _genome_operator(operator):
+    """Let a mutation on genome arrays of shape (pop, n_turbines, 2) also take a list of binary string layouts.
+    The mutated offspring are returned in the representation they were given in."""
+    @functools.wraps(operator)
+    def wrapper(offspring, mutation_rate, verbose=False, num_bits=None, **kwargs):
+        if isinstance(offspring, np.ndarray):
+            _require_num_bits(num_bits)
+            return operator(offspring, mutation_rate, verbose, num_bits, **kwargs)
+        num_bits = len(offspring[0][0]) // 2
+        mutated_offspring = operator(population_to_genome(offspring), mutation_rate, verbose, num_bits, **kwargs)
+        return genome_to_population(mutated_offspring, num_bits)
+    return wrapper
+
+
+def bernoulli_indices(n_trials, probability):
+    """Sorted indices of the successes in n_trials Bernoulli(probability) trials.
+    The gaps between successes are drawn from a geometric distribution, so the cost is proportional to the number
+    of successes rather than to n_trials."""
+    if n_trials <= 0 or probability <= 0:
+        return np.empty(0, dtype=np.int64)
+    if probability >= 1:
+        return np.arange(n_trials, dtype=np.int64)
+
+    expected = n_trials * probability
+    batch_size = int(expected + 4 * math.sqrt(expected)) + 16
+    chunks = []
+    last = -1
+    while True:
+        indices = last + np.cumsum(np.random.geometric(probability, size=batch_size), dtype=np.int64)
+        chunks.append(indices[indices < n_trials])
+        if indices[-1] >= n_trials:
+            return np.concatenate(chunks)
+        last = indices[-1]
+
+
+def _flip_bits(genome, bit_indices, num_bits):
+    """Copy of genome with the bits at bit_indices flipped. Bits are indexed over the flattened
+    (pop, n_turbines, 2, num_bits) bit space, most significant bit first; a bit listed twice is flipped back."""
+    mutated = genome.copy()
+    coordinates = bit_indices // num_bits
+    masks = (1 << (num_bits - 1 - bit_indices % num_bits)).astype(genome.dtype)
+    np.bitwise_xor.at(mutated.reshape(-1), coordinates, masks)
+    return mutated
+
+
+@_genome_operator
+def mutation_n_times_each_chromosome(offspring, mutation_rate, verbose=False, num_bits=None):
+    """Flip int(mutation_rate * 10) random bits of every turbine chromosome."""
+    n_chromosomes = offspring.shape[0] * offspring.shape[1]
+    genes = np.random.randint(0, 2 * num_bits, size=(n_chromosomes, int(mutation_rate * 10)))
+    bit_indices = np.arange(n_chromosomes)[:, np.newaxis] * 2 * num_bits + genes
+    return _flip_bits(offspring, bit_indices.reshape(-1), num_bits)
+
+
+@_genome_operator
+def mutation_each_chromosome(offspring, mutation_rate, verbose=False, num_bits=None):
+    """Every turbine chromosome is mutated with probability mutation_rate by flipping one of its bits at random."""
+    chromosomes = bernoulli_indices(offspring.shape[0] * offspring.shape[1], mutation_rate)
+    bit_indices = chromosomes * 2 * num_bits + np.random.randint(0, 2 * num_bits, size=len(chromosomes))
+    if verbose:
+        print('mutation_counter:', len(chromosomes) / (offspring.shape[0] * offspring.shape[1]))
+    return _flip_bits(offspring, bit_indices, num_bits)
+
+
+@_genome_operator
+def mutation_concatenated_layout(offspring, mutation_rate, verbose=False, num_bits=None):
+    """Every bit of the offspring is flipped independently with probability mutation_rate."""
+    bit_indices = bernoulli_indices(offspring.size * num_bits, mutation_rate)
+    if verbose:
+        print("mutation counter: ", len(bit_indices))
+    return _flip_bits(offspring, bit_indices, num_bits)
+
+
+def _perturb_coordinates(offspring, mutation_rate, num_bits, draw_steps):
+    """Add draw_steps(k) to k coordinates chosen with probability mutation_rate, clipped to the encodable range."""
+    mutated = offspring.copy()
+    coordinates = bernoulli_indices(offspring.size, mutation_rate)
+    flat = mutated.reshape(-1)
+    values = flat[coordinates].astype(float) + draw_steps(len(coordinates))
+    flat[coordinates] = np.clip(np.rint(values), 0, (1 << num_bits) - 1)
+    return mutated, len(coordinates)
+
+
+@_genome_operator
+def gaussian_mutation(offspring, mutation_rate, verbose=False, num_bits=None, scale=0.05):
+    """Every coordinate is moved with probability mutation_rate by a normal step with standard deviation
+    scale times the coordinate range."""
+    sigma = scale * ((1 << num_bits) - 1)
+    mutated, mutation_counter = _perturb_coordinates(offspring, mutation_rate, num_bits,
+                                                     lambda size: np.random.normal(0, sigma, size=size))
+    if verbose:
+        print("mutation counter: ", mutation_counter)
+    return mutated
+
+
+@_genome_operator
+def creep_mutation(offspring, mutation_rate, verbose=False, num_bits=None, max_step=0.02):
+    """Every coordinate is moved with probability mutation_rate by a uniform integer step of at most
+    max_step times the coordinate range (and at least 1) in either direction."""
+    step = max(1, int(max_step * ((1 << num_bits) - 1)))
+    mutated, mutation_counter = _perturb_coordinates(offspring, mutation_rate, num_bits,
+                                                     lambda size: np.random.randint(-step, step + 1, size=size))
     if verbose:
         print("mutation counter: ", mutation_counter)
-    return mutated_offspring
+    return mutated
 
 
-def mutation(offspring, mutation_rate, verbose=False):
-    return mutation_each_chromosome(offspring, mutation_rate, verbose)
\ No newline at end of file
+def mutation(offspring, mutation_rate, verbose=False, num_bits=None):
+    """Mutation entry point. Offspring can be a list of binary string layouts or a genome array (num_bits required)."""
+    return mutation_each_chromosome(offspring, mutation_rate, verbose, num_bits)
+    # return mutation_n_times_each_chromosome(offspring, mutation_rate, verbose, num_bits)
+    # return mutation_concatenated_layout(offspring, mutation_rate, verbose, num_bits)
+    # return gaussian_mutation(offspring, mutation_rate, verbose, num_bits)
+    # return creep_mutation(offspring, mutation_rate, verbose, num_bits)
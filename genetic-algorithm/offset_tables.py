@@ -0,0 +1,156 @@
+import hashlib
+import math
+import os
+import tempfile
+import numpy as np
+from fitness import ROTOR_RADIUS, C_T, K_W, BATCH_MAX_PAIRS, pair_terms, energy_from_wake_deficit, boundary_terms, \
+    penalty_terms, combine_fitness_terms
+from wind_rose import directional_wake_deficit
+
+
+TABLES_DIR = os.path.join(tempfile.gettempdir(), 'wind_farm_offset_tables')
+MAX_TABLE_BYTES = 2**28  # disk and page cache used by the tables of one OffsetTables
+
+
+def _cached_table(path, shape, fill):
+    """Memory map the .npy table at path, building it with fill(table) first if it does not exist yet.
+    The table is written to a temporary file and renamed, so concurrent builders never see a partial table."""
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.npy.tmp')
+        os.close(file_descriptor)
+        try:
+            table = np.lib.format.open_memmap(temporary_path, mode='w+', dtype=float, shape=shape)
+            fill(table)
+            table.flush()
+            del table
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+    return np.load(path, mmap_mode='r')
+
+
+def _directional_terms(dx, dy, wind_rose):
+    """Deficit in every sector of a turbine at the integer offsets (dx, dy) from a turbine at the origin, caused by
+    the one at the origin, shape (sectors, len(dx)). Computed with directional_wake_deficit on two turbine layouts,
+    so the values are those of the direct evaluation; the offsets are chunked like evaluate_fitness_wind_rose."""
+    terms = np.empty((len(wind_rose), len(dx)))
+    chunk_size = max(1, BATCH_MAX_PAIRS // (4 * len(wind_rose)))
+    for start in range(0, len(dx), chunk_size):
+        offsets = np.stack([dx[start:start + chunk_size], dy[start:start + chunk_size]], axis=-1)
+        layout = np.stack([offsets, np.zeros_like(offsets)], axis=1).astype(float)
+        terms[:, start:start + chunk_size] = directional_wake_deficit(layout, wind_rose)[..., 0]
+    return terms
+
+
+class OffsetTables:
+    """Pair terms of the fitness on the integer site grid, tabulated by the offset (dx, dy) of the two turbines.
+
+    Decoded turbine coordinates are integers, so the wake deficit of a pair only depends on (|dx|, |dy|) and the
+    directional deficit of every wind rose sector on the signed offset. Without a wind rose the spacing penalty is
+    tabulated too; it is zero beyond min_spacing, so its table only covers |dx|, |dy| <= ceil(min_spacing). With
+    one the penalties come from penalty_terms, as in evaluate_fitness_wind_rose. The wake tables cover the offsets
+    up to radius in both coordinates, the largest radius up to 2**num_bits - 1 for which all tables fit in
+    max_bytes; pairs further apart are computed directly by evaluate_fitness_tables. The tables are computed with
+    the same functions as the direct evaluation, so the values are identical. They are built once per set of
+    parameters and cached in cache_dir as .npy files that are memory mapped, and pickled by path for the fitness
+    pool workers."""
+
+    def __init__(self, num_bits, min_spacing, wind_rose=None, cache_dir=TABLES_DIR, max_bytes=MAX_TABLE_BYTES):
+        self.num_bits = num_bits
+        self.min_spacing = min_spacing
+        self.wind_rose = wind_rose
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._open()
+
+    def _key(self, *parts):
+        parts = (self.num_bits, self.min_spacing, ROTOR_RADIUS, C_T, K_W) + parts
+        return hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+
+    def _open(self):
+        max_offset = (1 << self.num_bits) - 1
+        self.wake = self.spacing = self.sector_deficit = None
+        if self.wind_rose is None:
+            self.spacing_radius = min(max_offset, max(0, math.ceil(self.min_spacing)))
+            wake_bytes = self.max_bytes - 8 * (self.spacing_radius + 1) ** 2
+            self.radius = min(max_offset, math.isqrt(max(0, wake_bytes) // 8) - 1)
+        else:
+            self.spacing_radius = None
+            self.radius = min(max_offset, (math.isqrt(self.max_bytes // (8 * len(self.wind_rose))) - 1) // 2)
+        if self.radius < 0:
+            raise ValueError(f"Offset tables do not fit in max_bytes={self.max_bytes}.")
+
+        if self.wind_rose is None:
+            def fill_pair_terms(table, radius, term):
+                for dx in range(radius + 1):
+                    row = np.stack([np.full(radius + 1, dx), np.arange(radius + 1)], axis=-1)
+                    table[dx] = pair_terms(row, 0, self.min_spacing)[term]
+
+            self.spacing = _cached_table(os.path.join(self.cache_dir, f'spacing_{self._key(self.spacing_radius)}.npy'),
+                                         (self.spacing_radius + 1, self.spacing_radius + 1),
+                                         lambda table: fill_pair_terms(table, self.spacing_radius, 1))
+            self.wake = _cached_table(os.path.join(self.cache_dir, f'wake_{self._key(self.radius)}.npy'),
+                                      (self.radius + 1, self.radius + 1),
+                                      lambda table: fill_pair_terms(table, self.radius, 0))
+        else:
+            signed = np.arange(-self.radius, self.radius + 1)
+
+            def fill_sector_deficit(table):
+                for row, dx in enumerate(signed):
+                    table[:, row] = _directional_terms(np.full(len(signed), dx), signed, self.wind_rose)
+
+            key = self._key(self.radius, tuple(self.wind_rose.directions))
+            self.sector_deficit = _cached_table(os.path.join(self.cache_dir, f'sectors_{key}.npy'),
+                                                (len(self.wind_rose), len(signed), len(signed)), fill_sector_deficit)
+
+    def __getstate__(self):
+        return {'num_bits': self.num_bits, 'min_spacing': self.min_spacing, 'wind_rose': self.wind_rose,
+                'cache_dir': self.cache_dir, 'max_bytes': self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._open()
+
+
+def evaluate_fitness_tables(positions, weights, area_size, min_spacing, wind_speed, tables, power_curve=None):
+    """evaluate_fitness_batch, or evaluate_fitness_wind_rose when the tables have a wind rose, with the pair terms
+    gathered from OffsetTables instead of computed, apart from the wake terms of pairs beyond tables.radius.
+    positions must be integers."""
+    positions = np.asarray(positions)
+    population_size, n_turbines = positions.shape[:2]
+    n_sectors = 1 if tables.wind_rose is None else len(tables.wind_rose)
+    chunk_size = max(1, BATCH_MAX_PAIRS // max(1, n_sectors * n_turbines * n_turbines))
+    pairs = np.triu(np.ones((n_turbines, n_turbines), dtype=bool), k=1)
+    radius, spacing_radius = tables.radius, tables.spacing_radius
+
+    fitness_values = np.empty(population_size)
+    for start in range(0, population_size, chunk_size):
+        chunk = positions[start:start + chunk_size].astype(np.intp)
+        dx = chunk[:, :, np.newaxis, 0] - chunk[:, np.newaxis, :, 0]
+        dy = chunk[:, :, np.newaxis, 1] - chunk[:, np.newaxis, :, 1]
+        abs_dx, abs_dy = np.abs(dx), np.abs(dy)
+        far = (abs_dx > radius) | (abs_dy > radius)
+
+        if tables.wind_rose is None:
+            wake_terms = tables.wake[np.minimum(abs_dx, radius), np.minimum(abs_dy, radius)]
+            wake_terms[far] = pair_terms(np.stack([abs_dx[far], abs_dy[far]], axis=-1), 0, min_spacing)[0]
+            energy_production = energy_from_wake_deficit(wake_terms.sum(axis=-1), wind_speed, power_curve)
+
+            near = pairs & (abs_dx <= spacing_radius) & (abs_dy <= spacing_radius)
+            spacing_terms = np.where(near, tables.spacing[np.minimum(abs_dx, spacing_radius),
+                                                          np.minimum(abs_dy, spacing_radius)], 0.0)
+            spacing_fitness = -spacing_terms.sum(axis=(1, 2))
+            boundary_fitness, within_bounds = boundary_terms(chunk, area_size)
+            is_valid = within_bounds & ~(spacing_terms > 0).any(axis=(1, 2))
+        else:
+            offset_index = (np.clip(dx, -radius, radius) + radius, np.clip(dy, -radius, radius) + radius)
+            sector_terms = np.stack([table[offset_index] for table in tables.sector_deficit])
+            sector_terms[:, far] = _directional_terms(dx[far], dy[far], tables.wind_rose)
+            sector_energy = energy_from_wake_deficit(sector_terms.sum(axis=-1), wind_speed, power_curve)
+            energy_production = tables.wind_rose.mean(sector_energy)
+            boundary_fitness, spacing_fitness, is_valid = penalty_terms(chunk, area_size, min_spacing)
+        fitness_values[start:start + chunk_size] = combine_fitness_terms(
+            weights, energy_production, boundary_fitness, spacing_fitness, is_valid)
+    return fitness_values
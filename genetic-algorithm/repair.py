@@ -0,0 +1,64 @@
+import numpy as np
+from fitness import boundary_terms
+from utils import population_to_genome, genome_to_population, GENOME_DTYPE
+from spatial import close_pairs_batch
+
+
+def is_feasible(positions, area_size, min_spacing):
+    """Whether each layout of shape (pop, n_turbines, 2) is valid as in is_layout_valid: within the area and
+    without pairs closer than min_spacing."""
+    positions = np.asarray(positions, dtype=float)
+    population_size, n_turbines = positions.shape[:2]
+    first = close_pairs_batch(positions, min_spacing)[0]
+    return boundary_terms(positions, area_size)[1] & (np.bincount(first // n_turbines,
+                                                                  minlength=population_size) == 0)
+
+
+def repair_positions(positions, area_size, min_spacing, max_iterations=40, push_iterations=10):
+    """Move the turbines of integer layouts of shape (pop, n_turbines, 2) into a feasible layout.
+
+    Turbines are clamped to [0, area_size - 1], where they pay no boundary penalty. In the first push_iterations
+    rounds every pair closer than min_spacing is pushed apart along the line through both turbines (a random
+    direction for turbines on the same spot), each by half the missing distance plus half a grid step, so rounding
+    back to the grid does not undo it; pushes on a turbine add up. Pushing stalls in crowded corners, so in the
+    remaining rounds the second turbine of every pair still too close is moved to a random spot instead. The whole
+    population is moved at once. Returns the repaired positions and whether each layout is feasible."""
+    positions = np.clip(np.rint(np.asarray(positions, dtype=float)), 0, area_size - 1)
+    population_size, n_turbines = positions.shape[:2]
+    flat_positions = positions.reshape(-1, 2)
+
+    for iteration in range(max_iterations):
+        first, second, _ = close_pairs_batch(positions, min_spacing)
+        if not len(first):
+            break
+        if iteration >= push_iterations:
+            relocated = np.unique(second)
+            flat_positions[relocated] = np.random.randint(0, area_size, (len(relocated), 2))
+            continue
+        offsets = flat_positions[second] - flat_positions[first]
+        distances = np.sqrt((offsets ** 2).sum(axis=-1))
+        coincident = distances == 0
+        angles = np.random.uniform(0, 2 * np.pi, int(coincident.sum()))
+        offsets[coincident] = np.stack([np.cos(angles), np.sin(angles)], axis=-1)
+        distances[coincident] = 1
+        pushes = offsets * (((min_spacing - distances) / 2 + 0.5) / distances)[:, np.newaxis]
+        for axis in range(2):
+            flat_positions[:, axis] += (np.bincount(second, weights=pushes[:, axis], minlength=len(flat_positions))
+                                        - np.bincount(first, weights=pushes[:, axis], minlength=len(flat_positions)))
+        np.clip(np.rint(flat_positions, out=flat_positions), 0, area_size - 1, out=flat_positions)
+
+    first = close_pairs_batch(positions, min_spacing)[0]
+    return positions.astype(int), np.bincount(first // n_turbines, minlength=population_size) == 0
+
+
+def repair(offspring, area_size, min_spacing, max_iterations=40):
+    """Repair a genome array (or list of binary string layouts) with repair_positions.
+    Returns the repaired offspring in the representation they were given in, and the fraction of feasible layouts
+    before and after the repair."""
+    genome = offspring if isinstance(offspring, np.ndarray) else population_to_genome(offspring)
+    feasible_before = is_feasible(genome, area_size, min_spacing)
+    positions, feasible_after = repair_positions(genome, area_size, min_spacing, max_iterations)
+    repaired = positions.astype(GENOME_DTYPE)
+    if not isinstance(offspring, np.ndarray):
+        repaired = genome_to_population(repaired, len(offspring[0][0]) // 2)
+    return repaired, float(feasible_before.mean()), float(feasible_after.mean())
@@ -1,5 +1,6 @@
-from fitness import evaluate_fitness
+from utils import concatenate_populations, take_individuals
 import random
+import numpy as np
 
 
 # def elitism_replacement(population, offspring, fitness_values, num_elites):
@@ -12,33 +13,39 @@ import random
 #     return next_generation_population
 
 
-def generational_replacement(offspring):
+def generational_replacement(offspring, offspring_fitness_values):
     """The entire population is replaced by the offspring generated from the current population."""
-    return offspring
+    return offspring, np.asarray(offspring_fitness_values, dtype=float)
 
 
-def steady_state_replacement(population, offspring, fitness_values, fitness_params, next_population_size=None):
-    """The least fit individuals are replaced by new offspring."""
+def steady_state_replacement(population, offspring, fitness_values, offspring_fitness_values, next_population_size=None):
+    """The least fit individuals are replaced by new offspring. Returns the survivors and their fitness values."""
     if not next_population_size:
-        next_population_size = population
+        next_population_size = len(population)
 
-    combined_population = population + offspring
-    combined_fitness_values = fitness_values + evaluate_fitness(offspring, *fitness_params)
-    combined_population_sorted = [x for f, x in sorted(zip(combined_fitness_values, combined_population), reverse=True)]
-    next_generation_population = combined_population_sorted[:len(next_population_size)]
-    return next_generation_population
+    combined_population = concatenate_populations(population, offspring)
+    combined_fitness_values = np.concatenate([np.asarray(fitness_values, dtype=float),
+                                              np.asarray(offspring_fitness_values, dtype=float)])
+    if next_population_size < len(combined_fitness_values):
+        best_indices = np.argpartition(-combined_fitness_values, next_population_size - 1)[:next_population_size]
+    else:
+        best_indices = np.arange(len(combined_fitness_values))
+    survivor_indices = best_indices[np.argsort(-combined_fitness_values[best_indices], kind='stable')]
+    return take_individuals(combined_population, survivor_indices), combined_fitness_values[survivor_indices]
 
 
-def tournament_replacement(population, offspring, tournament_size, fitness_params):
+def tournament_replacement(population, offspring, fitness_values, offspring_fitness_values, tournament_size):
     """A subset of individuals from the combined parent and offspring populations compete in a tournament,
      and the winners form the next generation"""
-    combined_population = population + offspring
-    next_generation_population = []
-    while len(next_generation_population) < len(population):
-        tournament = random.sample(combined_population, tournament_size)
-        best_individual = max(tournament, key=lambda x: evaluate_fitness([x], *fitness_params))
-        next_generation_population.append(best_individual)
-    return next_generation_population
+    combined_population = concatenate_populations(population, offspring)
+    combined_fitness_values = np.concatenate([np.asarray(fitness_values, dtype=float),
+                                              np.asarray(offspring_fitness_values, dtype=float)])
+    next_generation_indices = []
+    while len(next_generation_indices) < len(population):
+        tournament = random.sample(range(len(combined_population)), tournament_size)
+        best_index = max(tournament, key=lambda i: combined_fitness_values[i])
+        next_generation_indices.append(best_index)
+    return take_individuals(combined_population, next_generation_indices), combined_fitness_values[next_generation_indices]
 
 
 # def rank_based_replacement(population, offspring):
@@ -64,7 +71,9 @@ def tournament_replacement(population, offspring, tournament_size, fitness_param
 #     return next_generation_population
 
 
-def replacement(population, offspring, fitness_values, fitness_params, next_population_size=None):
-    # return generational_replacement(offspring)
-    # return tournament_replacement(population, offspring, len(population)//2, fitness_params)
-    return steady_state_replacement(population, offspring, fitness_values, fitness_params, next_population_size)
\ No newline at end of file
+def replacement(population, offspring, fitness_values, offspring_fitness_values, next_population_size=None):
+    """Replacement entry point. Returns the next population together with its fitness values,
+    so that no individual has to be evaluated again."""
+    # return generational_replacement(offspring, offspring_fitness_values)
+    # return tournament_replacement(population, offspring, fitness_values, offspring_fitness_values, len(population)//2)
+    return steady_state_replacement(population, offspring, fitness_values, offspring_fitness_values, next_population_size)
@@ -1,20 +1,73 @@
 import random
+import numpy as np
+from utils import take_individuals
 
 
-def base_selection(population, fitness_values):
-    """Perform selection of individuals from the population based on their fitness values."""
-    total_fitness = sum([(f if f > float('-inf') else 0) for f in fitness_values])
+def selection_probabilities(fitness_values):
+    """Fitness proportional selection probabilities.
+    Fitness values of -inf get no chance; if any finite value is negative, all are shifted by the minimum first,
+    so the negative scores of penalized layouts still rank correctly."""
+    fitness_values = np.asarray(fitness_values, dtype=float)
+    finite = np.isfinite(fitness_values)
+    weights = np.where(finite, fitness_values, 0.0)
+    if finite.any() and weights[finite].min() < 0:
+        weights = np.where(finite, weights - weights[finite].min(), 0.0)
+
+    total_fitness = weights.sum()
     if not total_fitness:
-        probabilities = [1 / len(population)] * len(population)
-    else:
-        probabilities = [(f / total_fitness if f > float('-inf') else 0) for f in fitness_values]
+        return np.full(len(fitness_values), 1 / len(fitness_values))
+    return weights / total_fitness
+
+
+def roulette_indices(probabilities, n_selected):
+    """Draw n_selected indices with cumulative sums and a binary search, O(log n) per pick."""
+    cumulative_probabilities = np.cumsum(probabilities)
+    spins = np.random.random(n_selected) * cumulative_probabilities[-1]
+    return np.minimum(np.searchsorted(cumulative_probabilities, spins, side='right'), len(probabilities) - 1)
+
+
+def alias_table(probabilities):
+    """Build Walker's alias table (Vose's method) in O(n)."""
+    n = len(probabilities)
+    scaled = np.asarray(probabilities, dtype=float) * n / np.sum(probabilities)
+    acceptance = np.ones(n)
+    alias = np.arange(n)
+    small = [i for i in range(n) if scaled[i] < 1]
+    large = [i for i in range(n) if scaled[i] >= 1]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        acceptance[less] = scaled[less]
+        alias[less] = more
+        scaled[more] += scaled[less] - 1
+        (small if scaled[more] < 1 else large).append(more)
+    return acceptance, alias
+
+
+def alias_indices(table, n_selected):
+    """Draw n_selected indices from an alias table, O(1) per pick."""
+    acceptance, alias = table
+    columns = np.random.randint(0, len(acceptance), size=n_selected)
+    return np.where(np.random.random(n_selected) < acceptance[columns], columns, alias[columns])
+
 
-    selected_population = []
-    for _ in range(len(population)):
-        selected_individual = roulette_wheel_select(population, probabilities)
-        selected_population.append(selected_individual)
+def stochastic_universal_indices(probabilities, n_selected):
+    """Stochastic universal sampling: n_selected evenly spaced pointers with one random offset."""
+    cumulative_probabilities = np.cumsum(probabilities)
+    pointers = (np.random.random() + np.arange(n_selected)) * cumulative_probabilities[-1] / n_selected
+    return np.minimum(np.searchsorted(cumulative_probabilities, pointers, side='right'), len(probabilities) - 1)
 
-    return selected_population
+
+def tournament_indices(fitness_values, n_selected, tournament_size):
+    """Winners of n_selected tournaments between tournament_size individuals drawn with replacement."""
+    fitness_values = np.asarray(fitness_values, dtype=float)
+    contestants = np.random.randint(0, len(fitness_values), size=(n_selected, tournament_size))
+    return contestants[np.arange(n_selected), fitness_values[contestants].argmax(axis=1)]
+
+
+def base_selection(population, fitness_values):
+    """Perform selection of individuals from the population based on their fitness values."""
+    probabilities = selection_probabilities(fitness_values)
+    return take_individuals(population, roulette_indices(probabilities, len(population)))
 
 
 def roulette_wheel_select(population, probabilities):
@@ -27,9 +80,25 @@ def roulette_wheel_select(population, probabilities):
             return individual
 
 
-def tournament_selection(population, tournament_size):
-    pass
+def alias_selection(population, fitness_values):
+    """Fitness proportional selection with an alias table."""
+    table = alias_table(selection_probabilities(fitness_values))
+    return take_individuals(population, alias_indices(table, len(population)))
+
+
+def stochastic_universal_selection(population, fitness_values):
+    """Fitness proportional selection with stochastic universal sampling."""
+    probabilities = selection_probabilities(fitness_values)
+    return take_individuals(population, stochastic_universal_indices(probabilities, len(population)))
+
+
+def tournament_selection(population, fitness_values, tournament_size=3):
+    """Each parent is the fittest of tournament_size randomly drawn individuals."""
+    return take_individuals(population, tournament_indices(fitness_values, len(population), tournament_size))
 
 
 def selection(population, fitness_values):
-    return base_selection(population, fitness_values)
\ No newline at end of file
+    return base_selection(population, fitness_values)
+    # return alias_selection(population, fitness_values)
+    # return stochastic_universal_selection(population, fitness_values)
+    # return tournament_selection(population, fitness_values)
@@ -0,0 +1,133 @@
+import math
+import random
+from collections import defaultdict
+import numpy as np
+
+
+class SpatialGrid:
+    """Uniform grid (cell list) over turbine positions.
+
+    With the cell size equal to the minimum spacing, every turbine closer than that to a position lies in the
+    position's cell or one of its 8 neighbours, so spacing checks look at a few turbines instead of all of them."""
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.positions = []
+
+    def _cell(self, position):
+        return math.floor(position[0] / self.cell_size), math.floor(position[1] / self.cell_size)
+
+    def insert(self, position):
+        """Add a position to the grid and return its index."""
+        self.positions.append(position)
+        self.cells[self._cell(position)].append(len(self.positions) - 1)
+        return len(self.positions) - 1
+
+    def neighbours(self, position):
+        """Indices of the inserted positions in the cells around position."""
+        cell_x, cell_y = self._cell(position)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                yield from self.cells.get((cell_x + dx, cell_y + dy), ())
+
+    def is_far_enough(self, position, min_spacing):
+        """Check if position keeps at least min_spacing (<= cell size) from every inserted position."""
+        for index in self.neighbours(position):
+            other = self.positions[index]
+            if math.hypot(position[0] - other[0], position[1] - other[1]) < min_spacing:
+                return False
+        return True
+
+
+def window_pairs(keys, width):
+    """All pairs (a, b) of turbines of the same layout with 0 <= keys[b] - keys[a] <= width, for keys of shape
+    (pop, n_turbines). The turbines are sorted by key once, after which the partners of each turbine are a
+    contiguous run found by binary search, so the cost is O(n log n + n k) per layout for k partners per turbine.
+    Returns flat indices into keys.ravel()."""
+    population_size, n_turbines = keys.shape
+    order = np.argsort(keys, axis=1, kind='stable')
+    sorted_keys = np.take_along_axis(keys, order, axis=1)
+    sorted_keys = sorted_keys - sorted_keys[:, :1]
+    # layouts are laid out one after another on one axis, far enough apart not to pair up
+    stride = sorted_keys[:, -1].max(initial=0) + width + 1
+    flat_keys = (sorted_keys + stride * np.arange(population_size)[:, np.newaxis]).ravel()
+
+    starts = np.arange(1, flat_keys.size + 1)
+    counts = np.searchsorted(flat_keys, flat_keys + width, side='right') - starts
+    first = np.repeat(np.arange(flat_keys.size), counts)
+    run_offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    second = np.repeat(starts, counts) + run_offsets
+
+    flat_order = (order + n_turbines * np.arange(population_size)[:, np.newaxis]).ravel()
+    return flat_order[first], flat_order[second]
+
+
+def close_pairs_batch(positions, min_spacing):
+    """Pairs of turbines closer than min_spacing in every layout of shape (pop, n_turbines, 2): flat indices a < b
+    into positions.reshape(-1, 2) and their distances. Candidates are the pairs within min_spacing along x, found
+    with window_pairs."""
+    positions = np.asarray(positions, dtype=float)
+    if min_spacing <= 0 or positions.shape[1] < 2:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0)
+    first, second = window_pairs(positions[..., 0], min_spacing)
+    flat_positions = positions.reshape(-1, 2)
+    distances = np.sqrt(((flat_positions[second] - flat_positions[first]) ** 2).sum(axis=-1))
+    too_close = distances < min_spacing
+    first, second = first[too_close], second[too_close]
+    return np.minimum(first, second), np.maximum(first, second), distances[too_close]
+
+
+def close_pairs(layout, min_spacing):
+    """Yield (i, j, distance) for every pair i < j of turbines closer than min_spacing."""
+    first, second, distances = close_pairs_batch(np.reshape(np.asarray(layout, dtype=float), (1, -1, 2)),
+                                                 min_spacing)
+    for index in np.lexsort((second, first)):
+        yield int(first[index]), int(second[index]), float(distances[index])
+
+
+def poisson_disk_layout(n_turbines, area_size, min_spacing, max_attempts=30):
+    """Sample n_turbines integer positions at least min_spacing apart.
+
+    Uniform random positions are accepted while they keep min_spacing from the accepted ones, checked against the
+    neighbouring grid cells only (dart throwing), until max_attempts in a row fail. On a site much larger than
+    n_turbines * min_spacing**2 this places every turbine within a few draws. On a crowded site Bridson's
+    Poisson-disk sampler then grows more points from the accepted ones: candidates are drawn in the annulus
+    [r, 2r] around a random active point, max_attempts per point. Sampling stops as soon as n_turbines points are
+    placed, so the cost does not grow with the site. Neither method packs the site densely, so when they place
+    fewer than n_turbines points the rest are placed uniformly at random, as in generate_random_layout, and left
+    to the is_valid penalty."""
+    if min_spacing <= 0:
+        return [[random.randint(0, area_size), random.randint(0, area_size)] for _ in range(n_turbines)]
+
+    grid = SpatialGrid(min_spacing)
+    failures = 0
+    while len(grid.positions) < n_turbines and failures < max_attempts:
+        candidate = (random.randint(0, area_size), random.randint(0, area_size))
+        if grid.is_far_enough(candidate, min_spacing):
+            grid.insert(candidate)
+            failures = 0
+        else:
+            failures += 1
+
+    # the darts are spread over the site, so growing from random ones keeps the layout spread
+    active = list(grid.positions)
+    while active and len(grid.positions) < n_turbines:
+        active_index = random.randrange(len(active))
+        x, y = active[active_index]
+        for _ in range(max_attempts):
+            radius = random.uniform(min_spacing, 2 * min_spacing)
+            angle = random.uniform(0, 2 * math.pi)
+            candidate = (round(x + radius * math.cos(angle)), round(y + radius * math.sin(angle)))
+            if (0 <= candidate[0] <= area_size and 0 <= candidate[1] <= area_size
+                    and grid.is_far_enough(candidate, min_spacing)):
+                grid.insert(candidate)
+                active.append(candidate)
+                break
+        else:
+            active[active_index] = active[-1]
+            active.pop()
+
+    missing = n_turbines - len(grid.positions)
+    return ([list(position) for position in grid.positions] +
+            [[random.randint(0, area_size), random.randint(0, area_size)] for _ in range(missing)])
@@ -0,0 +1,138 @@
+import math
+import numpy as np
+from fitness import BATCH_MAX_PAIRS, penalty_terms
+from utils import decode_population, take_individuals
+
+
+def layout_features(positions, area_size, min_spacing, n_bins=16):
+    """Permutation invariant features of decoded layouts of shape (pop, n_turbines, 2): the histogram of the pairwise
+    distances over [0, area_size * sqrt(2)], the spacing penalty and the number of turbines out of bounds."""
+    positions = np.asarray(positions, dtype=float)
+    population_size, n_turbines = positions.shape[:2]
+    pairs = np.triu_indices(n_turbines, k=1)
+    bin_width = area_size * math.sqrt(2) / n_bins
+    chunk_size = max(1, BATCH_MAX_PAIRS // max(1, n_turbines * n_turbines))
+
+    features = np.empty((population_size, n_bins + 2))
+    for start in range(0, population_size, chunk_size):
+        chunk = positions[start:start + chunk_size]
+        diff = chunk[:, pairs[0]] - chunk[:, pairs[1]]
+        distances = np.sqrt((diff ** 2).sum(axis=-1))
+        bins = np.minimum(distances // bin_width, n_bins - 1).astype(np.intp)
+        offsets = np.arange(len(chunk))[:, np.newaxis] * n_bins
+        histogram = np.bincount((offsets + bins).ravel(), minlength=len(chunk) * n_bins).reshape(len(chunk), n_bins)
+        features[start:start + chunk_size, :n_bins] = histogram
+    boundary_fitness, spacing_fitness, _ = penalty_terms(positions, area_size, min_spacing)
+    features[:, n_bins] = -spacing_fitness
+    features[:, n_bins + 1] = -boundary_fitness
+    return features
+
+
+class KNNSurrogate:
+    """Inverse distance weighted k nearest neighbours regression on standardized features.
+    Keeps the last max_samples training samples."""
+
+    def __init__(self, k=5, max_samples=5000):
+        self.k = k
+        self.max_samples = max_samples
+        self.features = None
+        self.fitness_values = None
+
+    def __len__(self):
+        return 0 if self.fitness_values is None else len(self.fitness_values)
+
+    def add(self, features, fitness_values):
+        fitness_values = np.asarray(fitness_values, dtype=float)
+        finite = np.isfinite(fitness_values)
+        features, fitness_values = features[finite], fitness_values[finite]
+        if self.features is not None:
+            features = np.concatenate([self.features, features])
+            fitness_values = np.concatenate([self.fitness_values, fitness_values])
+        self.features = features[-self.max_samples:]
+        self.fitness_values = fitness_values[-self.max_samples:]
+
+    def predict(self, features):
+        mean = self.features.mean(axis=0)
+        scale = self.features.std(axis=0)
+        scale[scale == 0] = 1
+        samples = (self.features - mean) / scale
+        queries = (features - mean) / scale
+        distances = np.sqrt(np.maximum(0, (queries ** 2).sum(axis=1)[:, np.newaxis] - 2 * queries @ samples.T
+                                       + (samples ** 2).sum(axis=1)))
+        k = min(self.k, len(samples))
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        weights = 1 / (np.take_along_axis(distances, nearest, axis=1) + 1e-9)
+        return (weights * self.fitness_values[nearest]).sum(axis=1) / weights.sum(axis=1)
+
+
+def rank_correlation(a, b):
+    """Spearman rank correlation of two vectors (ties broken by order), nan for fewer than two values."""
+    if len(a) < 2:
+        return float('nan')
+    ranks_a = np.argsort(np.argsort(a, kind='stable'), kind='stable')
+    ranks_b = np.argsort(np.argsort(b, kind='stable'), kind='stable')
+    if ranks_a.std() == 0 or ranks_b.std() == 0:
+        return float('nan')
+    return float(np.corrcoef(ranks_a, ranks_b)[0, 1])
+
+
+class SurrogateScreen:
+    """Pre-screening of offspring with a surrogate trained online on every exactly evaluated layout.
+
+    Once the surrogate holds min_samples layouts, only a budget fraction of the offspring is evaluated exactly:
+    the best by predicted fitness and, for an exploration fraction of the budget, random others, which keep the
+    surrogate honest and its accuracy statistics unbiased. The remaining offspring are discarded."""
+
+    def __init__(self, area_size, min_spacing, budget=0.5, exploration=0.1, k=5, max_samples=5000, min_samples=50):
+        self.area_size = area_size
+        self.min_spacing = min_spacing
+        self.budget = budget
+        self.exploration = exploration
+        self.min_samples = min_samples
+        self.model = KNNSurrogate(k, max_samples)
+
+    def state(self):
+        """Training samples of the surrogate as (features, fitness_values) arrays, e.g. for a checkpoint."""
+        if not len(self.model):
+            return np.empty((0, 0)), np.empty(0)
+        return self.model.features, self.model.fitness_values
+
+    def restore(self, features, fitness_values):
+        """Set the training samples of the surrogate, as returned by state."""
+        self.model.features = features if len(fitness_values) else None
+        self.model.fitness_values = fitness_values if len(fitness_values) else None
+
+    def _features(self, population):
+        return layout_features(decode_population(population), self.area_size, self.min_spacing)
+
+    def add(self, population, fitness_values):
+        """Train the surrogate on exactly evaluated layouts."""
+        self.model.add(self._features(population), fitness_values)
+
+    def screen(self, offspring, evaluate):
+        """Evaluate the promising offspring with evaluate(population) -> fitness vector.
+        Returns the evaluated offspring, their fitness and the surrogate statistics of this call."""
+        features = self._features(offspring)
+        n_offspring = len(features)
+        if len(self.model) < self.min_samples:
+            fitness_values = np.asarray(evaluate(offspring), dtype=float)
+            self.model.add(features, fitness_values)
+            return offspring, fitness_values, {'surrogate_screened': 0}
+
+        predicted = self.model.predict(features)
+        n_exact = min(n_offspring, max(1, math.ceil(self.budget * n_offspring)))
+        n_explore = min(n_exact - 1, int(self.exploration * n_exact))
+        order = np.argsort(-predicted, kind='stable')
+        explored = np.random.permutation(order[n_exact - n_explore:])[:n_explore]
+        selected = np.concatenate([order[:n_exact - n_explore], explored])
+
+        selected_offspring = take_individuals(offspring, selected)
+        fitness_values = np.asarray(evaluate(selected_offspring), dtype=float)
+        self.model.add(features[selected], fitness_values)
+        finite = np.isfinite(fitness_values)
+        return selected_offspring, fitness_values, {
+            'surrogate_screened': n_offspring - n_exact,
+            'surrogate_rank_correlation': rank_correlation(predicted[selected][finite], fitness_values[finite]),
+            'surrogate_mae': float(np.abs(predicted[selected][finite] - fitness_values[finite]).mean())
+                             if finite.any() else float('nan'),
+        }
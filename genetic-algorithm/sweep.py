@@ -0,0 +1,137 @@
+"""Multi-restart runs and hyperparameter sweeps of genetic_algorithm scheduled over a process pool.
+
+    from main import ga_config
+    rows = sweep(ga_config, {'mutation_rate': [0.01, 0.05], 'population_size': [50, 100]}, seeds=range(5),
+                 n_workers=8, min_generations=10, results_path='sweep.csv')
+"""
+import csv
+import itertools
+import math
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from genetic_algorithm import genetic_algorithm, fitness_setup
+from utils import decode_population, initialize_genome
+
+
+# settings the initial population, and in addition its fitness, depend on
+POPULATION_KEYS = ('n_turbines', 'area_size', 'min_spacing', 'population_size')
+FITNESS_KEYS = POPULATION_KEYS + ('fitness_weights', 'wind_speed', 'wind_direction', 'wind_rose', 'power_curve',
+                                  'fitness_backend', 'wake_tolerance')
+
+
+def parameter_grid(param_grid):
+    """All combinations of the values in param_grid, a dict of lists, as a list of dicts."""
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[name] for name in names))]
+
+
+def _shared_key(ga_config, seed, names):
+    return (seed,) + tuple(repr(ga_config.get(name)) for name in names)
+
+
+def _initial_population(ga_config, seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    return initialize_genome(ga_config['population_size'], ga_config['n_turbines'], ga_config['area_size'],
+                             ga_config['min_spacing'])
+
+
+def _initial_fitness(ga_config, population):
+    fitness_function, fitness_params = fitness_setup(ga_config)
+    return fitness_function(decode_population(population), *fitness_params)
+
+
+def _run(ga_config, seed):
+    """Best fitness, number of generations and wall time of one seeded run."""
+    random.seed(seed)
+    np.random.seed(seed)
+    generations = []
+    start = time.perf_counter()
+    (best_fitness, _), _, _ = genetic_algorithm(ga_config, on_generation=generations.append)
+    return float(best_fitness), len(generations), time.perf_counter() - start
+
+
+def _map(executor, function, arguments):
+    if executor is None:
+        return [function(*args) for args in arguments]
+    futures = [executor.submit(function, *args) for args in arguments]
+    return [future.result() for future in futures]
+
+
+def sweep(ga_config, param_grid, seeds, n_workers=1, min_generations=None, eta=2, results_path=None):
+    """Run genetic_algorithm for every combination of param_grid (overriding ga_config) and every seed.
+
+    Runs with the same seed start from the same initial population, which is generated and evaluated once for each
+    distinct set of problem settings and shared by all configurations. With min_generations the sweep eliminates
+    poor configurations by successive halving: all of them run for min_generations, the best 1/eta by mean best
+    fitness over the seeds run again for eta times as many generations, and so on up to max_generations. A run is
+    determined by its seed, so a surviving configuration is run again from the start rather than continued.
+
+    Returns the results table, one row per configuration and rung, which is also written to results_path as csv."""
+    grid = parameter_grid(param_grid)
+    configs = [dict(ga_config, **params, verbose=False, keep_history=False) for params in grid]
+    if n_workers > 1:
+        # the pool already runs one GA per process
+        configs = [dict(config, n_workers=1) for config in configs]
+    seeds = list(seeds)
+    max_generations = max(config['max_generations'] for config in configs)
+    generations = min(min_generations or max_generations, max_generations)
+
+    rows = []
+    executor = ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+    try:
+        population_inputs = {_shared_key(config, seed, POPULATION_KEYS): (config, seed)
+                             for config in configs for seed in seeds}
+        populations = dict(zip(population_inputs,
+                               _map(executor, _initial_population, population_inputs.values())))
+        fitness_inputs = {_shared_key(config, seed, FITNESS_KEYS):
+                          (config, populations[_shared_key(config, seed, POPULATION_KEYS)])
+                          for config in configs for seed in seeds}
+        fitness_values = dict(zip(fitness_inputs, _map(executor, _initial_fitness, fitness_inputs.values())))
+
+        def run_arguments(index, seed):
+            config = configs[index]
+            return (dict(config, max_generations=min(generations, config['max_generations']),
+                         initial_population=populations[_shared_key(config, seed, POPULATION_KEYS)],
+                         initial_fitness_values=fitness_values[_shared_key(config, seed, FITNESS_KEYS)]),
+                    seed)
+
+        candidates = list(range(len(configs)))
+        for rung in itertools.count():
+            runs = [(index, seed) for index in candidates for seed in seeds]
+            results = dict(zip(runs, _map(executor, _run, [run_arguments(*run) for run in runs])))
+
+            rung_rows = []
+            for index in candidates:
+                best_fitness, generations_run, seconds = zip(*(results[index, seed] for seed in seeds))
+                rung_rows.append({
+                    'config': index,
+                    **grid[index],
+                    'rung': rung,
+                    'generation_budget': min(generations, configs[index]['max_generations']),
+                    'mean_best_fitness': statistics.mean(best_fitness),
+                    'std_best_fitness': statistics.pstdev(best_fitness),
+                    'max_best_fitness': max(best_fitness),
+                    'mean_generations': statistics.mean(generations_run),
+                    'seconds': sum(seconds),
+                })
+            rows.extend(rung_rows)
+
+            if generations >= max_generations or len(candidates) <= 1:
+                break
+            rung_rows.sort(key=lambda row: -row['mean_best_fitness'])
+            candidates = sorted(row['config'] for row in rung_rows[:math.ceil(len(rung_rows) / eta)])
+            generations = min(generations * eta, max_generations)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if results_path:
+        with open(results_path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    return rows
@@ -0,0 +1,70 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from fitness import evaluate_fitness_batch
+from genetic_algorithm import genetic_algorithm
+from wind_rose import WIND_ROSE_PATH
+
+
+@pytest.fixture
+def async_config(ga_config):
+    return dict(ga_config, wind_rose=WIND_ROSE_PATH, asynchronous=True, max_evaluations=100, async_batch_size=3)
+
+
+def run(ga_config, seed=1):
+    random.seed(seed)
+    np.random.seed(seed)
+    generations = []
+    result = genetic_algorithm(ga_config, on_generation=generations.append)
+    return result, generations
+
+
+def test_every_child_is_evaluated_once(async_config):
+    (best_fitness, _), (max_fitness_values, _), avg_fitness_values = run(async_config)[0]
+    generations = run(async_config)[1]
+
+    assert sum(stats['evaluations'] for stats in generations) == 100
+    # generations are stagnation_interval = population_size evaluations, and a batch is never split
+    assert all(20 <= stats['evaluations'] < 23 for stats in generations[:-1])
+    assert len(max_fitness_values) == len(avg_fitness_values) == len(generations)
+    # steady-state replacement never loses the best individual
+    assert max_fitness_values == sorted(max_fitness_values)
+    assert best_fitness == max_fitness_values[-1] > 0
+
+
+def test_serial_run_is_reproducible(async_config):
+    first, second = run(async_config)[0], run(async_config)[0]
+    assert first[0][0] == second[0][0]
+    assert first[1][0] == second[1][0]
+    assert first[2] == second[2]
+
+
+@pytest.mark.parametrize('key', ['incremental_fitness', 'surrogate', 'checkpoint_path'])
+def test_generation_barrier_options_are_rejected(async_config, key):
+    with pytest.raises(ValueError):
+        genetic_algorithm(dict(async_config, **{key: True}))
+
+
+class SlowBackend:
+    """Fitness backend sleeping a few milliseconds per batch, so batches overlap the generation boundaries."""
+
+    def __init__(self, fitness_params):
+        self.fitness_params = fitness_params
+        self.calls = 0
+
+    def evaluate(self, positions):
+        self.calls += 1
+        time.sleep(0.002 * (1 + self.calls % 4))
+        return evaluate_fitness_batch(positions, *self.fitness_params)
+
+
+def test_worker_utilization_is_a_fraction(async_config, fitness_params):
+    generations = []
+    with ThreadPoolExecutor(4) as executor:
+        genetic_algorithm(dict(async_config, executor=executor, n_workers=4, async_batch_size=1, max_evaluations=120,
+                               fitness_backend=SlowBackend(fitness_params)),
+                          on_generation=generations.append)
+    assert len(generations) >= 5
+    assert all(0 <= stats['worker_utilization'] <= 1 for stats in generations)
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from backends import JensenBackend, JensenSimulator, WakeSimulatorBackend, pywake_simulator
+from wind_rose import WIND_ROSE_PATH, WindRose
+
+
+class FakeWindFarmModel:
+    """Stands in for a PyWake WindFarmModel: model(x, y, wd=...).aep() with the AEP of every turbine."""
+
+    def __init__(self, wind_speed):
+        self.wind_speed = wind_speed
+        self.farm_sizes = []
+
+    def __call__(self, x, y, wd):
+        self.farm_sizes.append(len(x))
+        simulator = JensenSimulator(self.wind_speed, wind_direction=wd)
+        energy_production = simulator(np.asarray(x)[np.newaxis], np.asarray(y)[np.newaxis])[0]
+        return type('SimulationResult', (), {'aep': lambda self: np.full(len(x), energy_production / len(x))})()
+
+
+@pytest.fixture
+def wind_rose():
+    return WindRose.from_csv(WIND_ROSE_PATH)
+
+
+def test_simulator_backend_matches_the_built_in_model(ga_config, random_positions, wind_rose):
+    params = (ga_config['fitness_weights'], ga_config['area_size'], ga_config['min_spacing'])
+    positions = random_positions(30, 12, ga_config['area_size'] + 20)
+    backend = WakeSimulatorBackend(JensenSimulator(ga_config['wind_speed'], wind_rose=wind_rose), *params)
+    expected = JensenBackend(*params, ga_config['wind_speed'], wind_rose=wind_rose).evaluate(positions)
+    np.testing.assert_array_equal(backend.evaluate(positions), expected)
+
+
+def test_pywake_simulator_keeps_layouts_apart(ga_config, random_positions):
+    wind_farm_model = FakeWindFarmModel(ga_config['wind_speed'])
+    layout = random_positions(1, 12, 2000)
+    x, y = np.repeat(layout[..., 0], 50, axis=0), np.repeat(layout[..., 1], 50, axis=0)
+
+    energy_production = pywake_simulator(wind_farm_model, wd=270.0)(x, y)
+
+    assert wind_farm_model.farm_sizes == [12] * 50
+    expected = JensenSimulator(ga_config['wind_speed'], wind_direction=270.0)(layout[..., 0], layout[..., 1])
+    np.testing.assert_allclose(energy_production, np.repeat(expected, 50), rtol=1e-12)
+    assert len(set(energy_production.tolist())) == 1
+
+
+def test_genetic_algorithm_runs_on_a_simulator_backend(ga_config, wind_rose, seeded_run, assert_same_result):
+    simulator = JensenSimulator(ga_config['wind_speed'], wind_rose=wind_rose)
+    backend = WakeSimulatorBackend(simulator, ga_config['fitness_weights'], ga_config['area_size'],
+                                   ga_config['min_spacing'])
+    result = seeded_run(dict(ga_config, fitness_backend=backend, fitness_cache_size=10000), 1)
+    assert simulator.calls > 0
+    assert_same_result(result, seeded_run(dict(ga_config, wind_rose=WIND_ROSE_PATH, fitness_cache_size=10000), 1))
@@ -0,0 +1,35 @@
+import random
+import numpy as np
+import pytest
+from checkpoint import load_checkpoint, save_checkpoint
+from wind_rose import WIND_ROSE_PATH
+
+
+def test_checkpoint_restores_the_random_state(tmp_path):
+    path = str(tmp_path / 'checkpoint.npz')
+    random.seed(7)
+    np.random.seed(7)
+    random.gauss(0, 1)
+    population = np.arange(24, dtype=np.uint16).reshape(2, 6, 2)
+    save_checkpoint(path, population=population)
+    expected = (random.random(), random.gauss(0, 1), np.random.random(3).tolist())
+
+    random.seed(0)
+    np.random.seed(0)
+    checkpoint = load_checkpoint(path)
+    assert (random.random(), random.gauss(0, 1), np.random.random(3).tolist()) == expected
+    np.testing.assert_array_equal(checkpoint['population'], population)
+    assert checkpoint['population'].dtype == np.uint16
+    assert [path.name for path in tmp_path.iterdir()] == ['checkpoint.npz']
+
+
+@pytest.mark.parametrize('extra_config', [{}, {'incremental_fitness': True},
+                                          {'wind_rose': WIND_ROSE_PATH, 'surrogate': True}])
+def test_resume_is_bit_identical(tmp_path, ga_config, seeded_run, assert_same_result, extra_config):
+    ga_config = dict(ga_config, **extra_config)
+    checkpoint_path = str(tmp_path / 'checkpoint.npz')
+    full = seeded_run(ga_config, 1)
+    seeded_run(dict(ga_config, max_generations=6, checkpoint_path=checkpoint_path, checkpoint_interval=3), 1)
+    # the random state comes from the checkpoint, not from the seed of the resumed run
+    resumed = seeded_run(dict(ga_config, resume_from=checkpoint_path), 2)
+    assert_same_result(resumed, full)
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from crossover import (onepoint_layouts_pair_crossover, twopoint_layouts_crossover, uniform_crossover,
+                       onepoint_coordinate_crossover, onepoint_position_crossover, arithmetic_crossover,
+                       blend_crossover)
+from utils import GENOME_DTYPE, encode_genome, genome_to_population, population_to_genome
+
+NUM_BITS = 9
+
+
+@pytest.fixture
+def parents(random_positions):
+    return encode_genome(random_positions(20, 10, 1 << NUM_BITS, seed=3), NUM_BITS)
+
+
+@pytest.mark.parametrize('operator', [onepoint_layouts_pair_crossover, twopoint_layouts_crossover,
+                                      uniform_crossover])
+def test_turbine_swaps_keep_the_genes_of_each_pair(parents, operator):
+    np.random.seed(0)
+    offspring = operator(parents, NUM_BITS)
+    assert offspring.shape == parents.shape and offspring.dtype == GENOME_DTYPE
+    parent1, parent2 = parents[0::2], parents[1::2]
+    child1, child2 = offspring[0::2], offspring[1::2]
+    from_parent1 = (child1 == parent1).all(axis=-1) & (child2 == parent2).all(axis=-1)
+    from_parent2 = (child1 == parent2).all(axis=-1) & (child2 == parent1).all(axis=-1)
+    assert (from_parent1 | from_parent2).all()
+
+
+def test_onepoint_crossover_cuts_once(parents):
+    np.random.seed(0)
+    offspring = onepoint_layouts_pair_crossover(parents, NUM_BITS)
+    from_parent1 = (offspring[0::2] == parents[0::2]).all(axis=-1)
+    # a prefix of at least one turbine comes from the first parent, the rest from the second
+    cut_points = from_parent1.argmin(axis=1)
+    assert (cut_points >= 1).all()
+    assert (from_parent1 == (np.arange(parents.shape[1]) < cut_points[:, np.newaxis])).all()
+
+
+def test_coordinate_crossover_swaps_low_bits_with_a_partner(parents):
+    np.random.seed(0)
+    offspring = onepoint_coordinate_crossover(parents, NUM_BITS)
+    assert offspring.shape == (2 * len(parents),) + parents.shape[1:] and offspring.dtype == GENOME_DTYPE
+    for parent, child1, child2 in zip(parents, offspring[0::2], offspring[1::2]):
+        # the children hold the bits of the parent and one other parent between them
+        partners = [other for other in parents if ((child1 ^ child2) == (parent ^ other)).all()
+                    and ((child1 & child2) == (parent & other)).all()]
+        assert partners
+        # and the first child keeps at least the most significant bit of every coordinate of the parent
+        assert ((child1 ^ parent) < (1 << (NUM_BITS - 1))).all()
+
+
+def test_position_crossover_keeps_the_bits_of_both_parents(parents):
+    np.random.seed(0)
+    offspring = onepoint_position_crossover(parents, NUM_BITS)
+    assert offspring.shape == (2 * len(parents),) + parents.shape[1:] and offspring.dtype == GENOME_DTYPE
+    assert not np.any(offspring >> NUM_BITS)
+    for parent, child1, child2 in zip(parents, offspring[0::2], offspring[1::2]):
+        assert any(((child1 ^ child2) == (parent ^ other)).all() and ((child1 & child2) == (parent & other)).all()
+                   for other in parents)
+
+
+def test_arithmetic_crossover_keeps_the_sum(parents):
+    np.random.seed(0)
+    offspring = arithmetic_crossover(parents, NUM_BITS).astype(int)
+    total = parents[0::2].astype(int) + parents[1::2]
+    assert (np.abs(offspring[0::2] + offspring[1::2] - total) <= 1).all()
+    assert (offspring[0::2] >= np.minimum(parents[0::2], parents[1::2])).all()
+    assert (offspring[0::2] <= np.maximum(parents[0::2], parents[1::2])).all()
+
+
+def test_blend_crossover_stays_in_the_extended_interval(parents):
+    np.random.seed(0)
+    offspring = blend_crossover(parents, NUM_BITS, alpha=0.5).astype(float)
+    low, high = np.minimum(parents[0::2], parents[1::2]), np.maximum(parents[0::2], parents[1::2])
+    extent = 0.5 * (high - low.astype(float))
+    for child in (offspring[0::2], offspring[1::2]):
+        assert (child >= np.floor(low - extent)).all() and (child <= np.ceil(high + extent)).all()
+    assert not np.any(offspring.astype(int) >> NUM_BITS)
+
+
+def test_binary_string_parents_match_the_genome(parents):
+    np.random.seed(0)
+    expected = onepoint_coordinate_crossover(parents, NUM_BITS)
+    np.random.seed(0)
+    offspring = onepoint_coordinate_crossover(genome_to_population(parents, NUM_BITS))
+    np.testing.assert_array_equal(population_to_genome(offspring), expected)
@@ -0,0 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from evaluator import FitnessEvaluator
+from fitness import evaluate_fitness_batch
+from genetic_algorithm import genetic_algorithm
+
+
+def test_executor_population_is_split_into_n_workers_chunks(fitness_params, random_positions):
+    positions = random_positions(10, 6, 300)
+    chunk_sizes = []
+
+    def fitness_function(chunk, *params):
+        chunk_sizes.append(len(chunk))
+        return evaluate_fitness_batch(chunk, *params)
+
+    with ThreadPoolExecutor(3) as executor:
+        evaluate = FitnessEvaluator(fitness_params, 3, executor, fitness_function=fitness_function)
+        fitness_values = evaluate(positions)
+    assert sorted(chunk_sizes) == [2, 4, 4]
+    np.testing.assert_array_equal(fitness_values, evaluate_fitness_batch(positions, *fitness_params))
+
+
+def test_executor_requires_n_workers(fitness_params, ga_config):
+    with ThreadPoolExecutor(2) as executor:
+        with pytest.raises(ValueError):
+            FitnessEvaluator(fitness_params, executor=executor)
+        with pytest.raises(ValueError):
+            genetic_algorithm(dict(ga_config, executor=executor))
+
+
+def test_process_pool_matches_serial_evaluation(fitness_params, random_positions):
+    positions = random_positions(25, 8, 300)
+    with FitnessEvaluator(fitness_params, n_workers=2) as evaluate:
+        assert evaluate.executor is not None
+        fitness_values = evaluate(positions)
+    assert evaluate.executor is None
+    np.testing.assert_array_equal(fitness_values, FitnessEvaluator(fitness_params)(positions))
@@ -0,0 +1,17 @@
+import numpy as np
+from fitness import fitness_multi_objective, evaluate_fitness_batch
+
+
+def test_batch_matches_scalar_fitness(fitness_params, random_positions):
+    positions = random_positions(40, 8, fitness_params[1] + 20)
+    batch = evaluate_fitness_batch(positions, *fitness_params)
+    scalar = [fitness_multi_objective([tuple(position) for position in layout], *fitness_params)
+              for layout in positions.tolist()]
+    np.testing.assert_allclose(batch, scalar, rtol=1e-12, atol=1e-9)
+
+
+def test_batch_does_not_depend_on_the_chunking(fitness_params, random_positions, monkeypatch):
+    positions = random_positions(30, 10, fitness_params[1])
+    expected = evaluate_fitness_batch(positions, *fitness_params)
+    monkeypatch.setattr('fitness.BATCH_MAX_PAIRS', 7 * 10 * 10)
+    np.testing.assert_array_equal(evaluate_fitness_batch(positions, *fitness_params), expected)
@@ -0,0 +1,46 @@
+import numpy as np
+from fitness import evaluate_fitness_batch
+from fitness_cache import FitnessCache, layout_keys
+
+
+def test_turbine_order_does_not_change_the_key(random_positions):
+    positions = random_positions(5, 10, 300)
+    shuffled = positions[:, np.random.default_rng(1).permutation(10)]
+    assert layout_keys(positions) == layout_keys(shuffled)
+    assert len(set(layout_keys(positions))) == 5
+
+
+def test_cached_layouts_are_not_evaluated_again(fitness_params, random_positions):
+    positions = random_positions(8, 6, 300)
+    evaluated = []
+
+    def fitness_function(batch):
+        evaluated.append(len(batch))
+        return evaluate_fitness_batch(batch, *fitness_params)
+
+    cache = FitnessCache()
+    first = cache.evaluate(np.concatenate([positions, positions[:2]]), fitness_function)
+    second = cache.evaluate(positions[::-1], fitness_function)
+
+    assert evaluated == [8]
+    np.testing.assert_array_equal(first[:8], evaluate_fitness_batch(positions, *fitness_params))
+    np.testing.assert_array_equal(second, first[:8][::-1])
+    assert cache.stats() == {'hits': 10, 'misses': 8, 'size': 8}
+
+
+def test_least_recently_used_is_evicted(fitness_params, random_positions):
+    positions = random_positions(4, 6, 300)
+
+    def fitness_function(batch):
+        return evaluate_fitness_batch(batch, *fitness_params)
+
+    cache = FitnessCache(max_entries=3)
+    cache.evaluate(positions[:3], fitness_function)
+    cache.evaluate(positions[:1], fitness_function)
+    cache.evaluate(positions[3:], fitness_function)
+
+    keys = layout_keys(positions)
+    assert len(cache) == 3
+    assert keys[1] not in cache._values
+    assert all(keys[i] in cache._values for i in (0, 2, 3))
+
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from fitness import fitness_terms_batch, combine_fitness_terms
+from gradients import (energy_gradient, energy_gradient_wind_rose, spacing_gradient, boundary_gradient,
+                       fitness_gradient)
+from local_search import gradient_refine
+from wind_rose import WIND_ROSE_PATH, WindRose, fitness_terms_wind_rose
+
+AREA_SIZE = 3000
+
+
+def finite_difference_gradient(function, positions, step=1e-4):
+    gradient = np.empty_like(positions)
+    for index in np.ndindex(positions.shape[1:]):
+        forward, backward = positions.copy(), positions.copy()
+        forward[(slice(None),) + index] += step
+        backward[(slice(None),) + index] -= step
+        gradient[(slice(None),) + index] = (function(forward) - function(backward)) / (2 * step)
+    return gradient
+
+
+@pytest.mark.parametrize('term', ['energy', 'energy_wind_rose', 'spacing', 'boundary', 'fitness'])
+def test_gradient_matches_finite_differences(ga_config, term):
+    weights, wind_speed = ga_config['fitness_weights'], ga_config['wind_speed']
+    wind_rose = WindRose.from_csv(WIND_ROSE_PATH)
+    positions = np.random.default_rng(2).uniform(-100, AREA_SIZE + 100, size=(6, 5, 2))
+    # a too close pair, to exercise the spacing term
+    positions[:, 1] = positions[:, 0] + [20.5, 30.25]
+    function = {
+        'energy': lambda positions: energy_gradient(positions, wind_speed),
+        'energy_wind_rose': lambda positions: energy_gradient_wind_rose(positions, wind_speed, wind_rose),
+        'spacing': lambda positions: spacing_gradient(positions, 100),
+        'boundary': lambda positions: boundary_gradient(positions, AREA_SIZE),
+        'fitness': lambda positions: fitness_gradient(positions, weights, AREA_SIZE, 100, wind_speed, wind_rose),
+    }[term]
+
+    value, gradient = function(positions)
+    expected = finite_difference_gradient(lambda positions: function(positions)[0], positions)
+    assert np.abs(expected).max() > 0
+    np.testing.assert_allclose(gradient, expected, rtol=1e-5, atol=1e-6 * np.abs(expected).max())
+
+
+@pytest.mark.parametrize('with_wind_rose', [False, True])
+def test_energy_matches_the_fitness(ga_config, with_wind_rose):
+    weights, wind_speed = ga_config['fitness_weights'], ga_config['wind_speed']
+    wind_rose = WindRose.from_csv(WIND_ROSE_PATH) if with_wind_rose else None
+    # within the site, so the boundary stand-in is zero like the boundary fitness
+    positions = np.random.default_rng(3).integers(0, AREA_SIZE, size=(10, 7, 2)).astype(float)
+    if wind_rose is None:
+        terms = fitness_terms_batch(positions, AREA_SIZE, 100, wind_speed)
+    else:
+        terms = fitness_terms_wind_rose(positions, AREA_SIZE, 100, wind_speed, wind_rose)
+    expected = combine_fitness_terms(weights, *terms[:3], np.ones(len(positions), dtype=bool))
+    value = fitness_gradient(positions, weights, AREA_SIZE, 100, wind_speed, wind_rose)[0]
+    np.testing.assert_allclose(value, expected, rtol=1e-12)
+
+
+def test_refine_only_keeps_improvements(ga_config):
+    weights, wind_speed = ga_config['fitness_weights'], ga_config['wind_speed']
+    wind_rose = WindRose.from_csv(WIND_ROSE_PATH)
+    positions = np.random.default_rng(4).integers(0, 600, size=(8, 10, 2))
+
+    def evaluate(positions):
+        return fitness_gradient(positions.astype(float), weights, 600, 50, wind_speed, wind_rose)[0]
+
+    def gradient(positions):
+        return fitness_gradient(positions, weights, 600, 50, wind_speed, wind_rose)[1]
+
+    fitness_values = evaluate(positions)
+    refined, refined_fitness_values, evaluations = gradient_refine(positions, fitness_values, evaluate, gradient,
+                                                                   600, steps=5)
+    np.testing.assert_array_equal(refined_fitness_values, evaluate(refined))
+    assert (refined_fitness_values >= fitness_values).all()
+    assert (refined_fitness_values > fitness_values).any()
+    assert 8 <= evaluations <= 40
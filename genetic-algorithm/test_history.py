@@ -0,0 +1,52 @@
+import random
+import numpy as np
+from genetic_algorithm import genetic_algorithm
+from history import HistoryReader, HistoryWriter
+from wind_rose import WIND_ROSE_PATH
+
+
+def test_reader_skips_a_torn_last_line(tmp_path):
+    path = str(tmp_path / 'history.jsonl')
+    with HistoryWriter(path) as writer:
+        for generation in range(5):
+            writer.write({'generation': generation, 'max_fitness': generation / 2, 'best_layout': [[generation, 1]]})
+    with open(path, 'ab') as file:
+        file.write(b'{"generation": 5, "max_fi')
+
+    history = HistoryReader(path)
+    assert len(history) == 5
+    assert history[3]['max_fitness'] == 1.5
+    assert [stats['generation'] for stats in history[::2]] == [0, 2, 4]
+    assert history.column('max_fitness', [4, 0]) == [2.0, 0.0]
+    assert history.layouts(slice(1, 3)) == [[(1, 1)], [(2, 1)]]
+
+
+def test_resumed_writer_drops_later_generations(tmp_path):
+    path = str(tmp_path / 'history.jsonl')
+    with HistoryWriter(path) as writer:
+        for generation in range(6):
+            writer.write({'generation': generation})
+    with open(path, 'ab') as file:
+        file.write(b'{"genera')
+    with HistoryWriter(path, start_generation=3) as writer:
+        writer.write({'generation': 3})
+    assert HistoryReader(path).column('generation') == [0, 1, 2, 3]
+
+
+def test_streamed_history_matches_the_returned_one(tmp_path, ga_config):
+    ga_config = dict(ga_config, wind_rose=WIND_ROSE_PATH)
+    path = str(tmp_path / 'history.jsonl')
+    random.seed(1)
+    np.random.seed(1)
+    _, (max_fitness_values, layouts), avg_fitness_values = genetic_algorithm(ga_config)
+    random.seed(1)
+    np.random.seed(1)
+    (best_fitness, best_layout), streamed, streamed_avg = genetic_algorithm(
+        dict(ga_config, history_path=path, keep_history=False))
+
+    history = HistoryReader(path)
+    assert streamed == ([], []) and streamed_avg == []
+    assert history.column('max_fitness') == max_fitness_values
+    assert history.column('avg_fitness') == avg_fitness_values
+    assert history.layouts() == layouts
+    assert best_fitness == max(max_fitness_values)
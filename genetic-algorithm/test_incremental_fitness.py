@@ -0,0 +1,21 @@
+import random
+import numpy as np
+from fitness import evaluate_fitness_batch
+from incremental_fitness import IncrementalFitness
+from mutation import mutation
+from utils import determine_num_bits, encode_genome
+
+
+def test_incremental_matches_batch(fitness_params, random_positions):
+    num_bits = determine_num_bits(fitness_params[1])
+    parents = encode_genome(random_positions(50, 30, 1 << num_bits), num_bits)
+    incremental = IncrementalFitness(*fitness_params)
+    incremental.evaluate(parents)
+    np.random.seed(0)
+    random.seed(0)
+    offspring = mutation(parents, 0.02, num_bits=num_bits)
+
+    fitness_values = incremental.evaluate_offspring(offspring, parents)
+    expected = evaluate_fitness_batch(offspring.astype(float), *fitness_params)
+    assert incremental.incremental_evaluations > 0
+    assert np.abs(fitness_values - expected).max() < 1e-9
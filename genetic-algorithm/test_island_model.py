@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from island_model import island_model, migration_sources, migration_targets
+from wind_rose import WIND_ROSE_PATH
+
+
+def test_migration_topologies():
+    assert [migration_targets(island, 4, 'ring') for island in range(4)] == [[1], [2], [3], [0]]
+    assert migration_sources(0, 4, 'ring') == [3]
+    assert migration_targets(1, 3, 'fully_connected') == [0, 2]
+    assert migration_sources(1, 3, 'fully_connected') == [0, 2]
+    assert migration_targets(0, 1, 'ring') == []
+    with pytest.raises(ValueError):
+        migration_targets(0, 2, 'star')
+
+
+@pytest.mark.parametrize('topology', ['ring', 'fully_connected'])
+def test_island_model_is_reproducible(ga_config, topology):
+    island_config = dict(ga_config, wind_rose=WIND_ROSE_PATH, n_islands=3, seed=5, max_generations=6,
+                         migration_interval=2, n_migrants=2, migration_topology=topology)
+    (best_fitness, best_layout), (max_fitness_values, layouts), avg_fitness_values = island_model(island_config)
+    repeated = island_model(island_config)
+
+    assert len(max_fitness_values) == len(layouts) == len(avg_fitness_values) == 6
+    # migrants only replace the worst individuals, so no island loses its best
+    assert max_fitness_values == sorted(max_fitness_values)
+    assert best_fitness == max_fitness_values[-1]
+    assert all(avg <= best for avg, best in zip(avg_fitness_values, max_fitness_values))
+    assert repeated[0][0] == best_fitness
+    np.testing.assert_array_equal(repeated[0][1], best_layout)
+    assert repeated[1][0] == max_fitness_values
+    assert repeated[2] == avg_fitness_values
+
+
+def test_island_model_rejects_checkpoints(ga_config):
+    with pytest.raises(ValueError):
+        island_model(dict(ga_config, checkpoint_path='checkpoint.npz'))
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from mutation import (bernoulli_indices, mutation_each_chromosome, mutation_concatenated_layout, creep_mutation,
+                      gaussian_mutation)
+from utils import GENOME_DTYPE, encode_genome, genome_to_population, population_to_genome
+
+NUM_BITS = 9
+
+
+@pytest.fixture
+def offspring(random_positions):
+    return encode_genome(random_positions(200, 25, 1 << NUM_BITS, seed=4), NUM_BITS)
+
+
+def _popcount(values):
+    return np.unpackbits(values.astype('>u2').view(np.uint8)).reshape(values.shape + (16,)).sum(axis=-1)
+
+
+@pytest.mark.parametrize('probability', [0.001, 0.05, 0.5])
+def test_bernoulli_indices_match_the_rate(probability):
+    np.random.seed(0)
+    n_trials = 400000
+    indices = bernoulli_indices(n_trials, probability)
+    assert (np.diff(indices) > 0).all() and indices[0] >= 0 and indices[-1] < n_trials
+    assert abs(len(indices) - n_trials * probability) < 5 * np.sqrt(n_trials * probability)
+    # the trials are independent of their position
+    halves = np.bincount(indices * 2 // n_trials, minlength=2)
+    assert abs(halves[0] - halves[1]) < 5 * np.sqrt(n_trials * probability)
+
+
+def test_bernoulli_indices_edge_cases():
+    assert len(bernoulli_indices(0, 0.5)) == 0
+    assert len(bernoulli_indices(10, 0)) == 0
+    np.testing.assert_array_equal(bernoulli_indices(5, 1), np.arange(5))
+
+
+def test_each_chromosome_flips_one_bit_at_the_rate(offspring):
+    np.random.seed(0)
+    mutation_rate = 0.1
+    mutated = mutation_each_chromosome(offspring, mutation_rate, num_bits=NUM_BITS)
+    assert mutated.dtype == GENOME_DTYPE and not np.any(mutated >> NUM_BITS)
+    flipped = _popcount(mutated ^ offspring).sum(axis=-1)
+    assert set(np.unique(flipped)) <= {0, 1}
+    n_chromosomes = offspring.shape[0] * offspring.shape[1]
+    assert abs(flipped.sum() - mutation_rate * n_chromosomes) < 5 * np.sqrt(mutation_rate * n_chromosomes)
+
+
+def test_concatenated_layout_flips_every_bit_at_the_rate(offspring):
+    np.random.seed(0)
+    mutation_rate = 0.02
+    mutated = mutation_concatenated_layout(offspring, mutation_rate, num_bits=NUM_BITS)
+    flips = np.unpackbits((mutated ^ offspring).astype('>u2').view(np.uint8)).reshape(-1, 16)[:, 16 - NUM_BITS:]
+    expected = mutation_rate * offspring.size
+    # every bit position of a coordinate, from the most to the least significant, is hit equally often
+    assert (np.abs(flips.sum(axis=0) - expected) < 5 * np.sqrt(expected)).all()
+
+
+@pytest.mark.parametrize('operator', [creep_mutation, gaussian_mutation])
+def test_perturbations_stay_in_range(offspring, operator):
+    np.random.seed(0)
+    mutated = operator(offspring, 0.2, num_bits=NUM_BITS)
+    assert mutated.dtype == GENOME_DTYPE and not np.any(mutated >> NUM_BITS)
+    moved = mutated != offspring
+    assert 0.17 < moved.mean() < 0.21
+    if operator is creep_mutation:
+        assert np.abs(mutated.astype(int) - offspring).max() <= int(0.02 * ((1 << NUM_BITS) - 1))
+
+
+def test_binary_string_offspring_match_the_genome(offspring):
+    np.random.seed(0)
+    expected = mutation_each_chromosome(offspring[:10], 0.3, num_bits=NUM_BITS)
+    np.random.seed(0)
+    mutated = mutation_each_chromosome(genome_to_population(offspring[:10], NUM_BITS), 0.3)
+    np.testing.assert_array_equal(population_to_genome(mutated), expected)
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from fitness import evaluate_fitness_batch
+from offset_tables import OffsetTables, evaluate_fitness_tables
+from utils import determine_num_bits
+from wind_rose import WIND_ROSE_PATH, WindRose, evaluate_fitness_wind_rose
+
+
+@pytest.mark.parametrize('with_wind_rose', [False, True])
+@pytest.mark.parametrize('max_bytes', [2**28, 2**16])
+def test_offset_tables_match_direct_evaluation(tmp_path, fitness_params, random_positions, with_wind_rose,
+                                               max_bytes):
+    weights, area_size, min_spacing, wind_speed, wind_direction = fitness_params
+    num_bits = determine_num_bits(area_size)
+    wind_rose = WindRose.from_csv(WIND_ROSE_PATH) if with_wind_rose else None
+    tables = OffsetTables(num_bits, min_spacing, wind_rose, str(tmp_path), max_bytes)
+    positions = random_positions(60, 14, 1 << num_bits)
+
+    fitness_values = evaluate_fitness_tables(positions, weights, area_size, min_spacing, wind_speed, tables)
+    if wind_rose is None:
+        expected = evaluate_fitness_batch(positions, *fitness_params)
+    else:
+        expected = evaluate_fitness_wind_rose(positions, weights, area_size, min_spacing, wind_speed, wind_rose)
+    np.testing.assert_array_equal(fitness_values, expected)
+
+
+def test_tables_are_cached_and_bounded(tmp_path, fitness_params):
+    num_bits = determine_num_bits(fitness_params[1])
+    tables = OffsetTables(num_bits, fitness_params[2], cache_dir=str(tmp_path), max_bytes=2**16)
+    assert tables.wake.nbytes + tables.spacing.nbytes <= 2**16
+    files = sorted(path.name for path in tmp_path.iterdir())
+    OffsetTables(num_bits, fitness_params[2], cache_dir=str(tmp_path), max_bytes=2**16)
+    assert sorted(path.name for path in tmp_path.iterdir()) == files
+    with pytest.raises(ValueError):
+        OffsetTables(num_bits, fitness_params[2], cache_dir=str(tmp_path), max_bytes=100)
@@ -0,0 +1,36 @@
+import numpy as np
+from repair import is_feasible, repair, repair_positions
+from utils import encode_genome, is_layout_valid
+
+
+def test_feasibility_matches_is_layout_valid(ga_config, random_positions):
+    area_size, min_spacing = ga_config['area_size'], ga_config['min_spacing']
+    positions = random_positions(100, 5, area_size + 20)
+    expected = [is_layout_valid([tuple(position) for position in layout], area_size, min_spacing)
+                for layout in positions.tolist()]
+    np.testing.assert_array_equal(is_feasible(positions, area_size, min_spacing), expected)
+    assert 0 < np.mean(expected) < 1
+
+
+def test_repair_makes_layouts_feasible(ga_config, random_positions):
+    np.random.seed(0)
+    area_size, min_spacing = ga_config['area_size'], ga_config['min_spacing']
+    positions = random_positions(100, 12, area_size + 20)
+    repaired, feasible = repair_positions(positions, area_size, min_spacing)
+
+    np.testing.assert_array_equal(is_feasible(repaired, area_size, min_spacing), feasible)
+    assert feasible.mean() > 0.9
+    assert repaired.min() >= 0 and repaired.max() <= area_size - 1
+    # feasible layouts are left where they are
+    untouched = is_feasible(positions, area_size - 1, min_spacing)
+    np.testing.assert_array_equal(repaired[untouched], positions[untouched])
+
+
+def test_repair_reports_the_feasible_fraction(ga_config, random_positions):
+    np.random.seed(0)
+    area_size, min_spacing = ga_config['area_size'], ga_config['min_spacing']
+    genome = encode_genome(random_positions(50, 8, 1 << 9), 9)
+    repaired, feasible_before, feasible_after = repair(genome, area_size, min_spacing)
+    assert repaired.dtype == genome.dtype and repaired.shape == genome.shape
+    assert feasible_before == is_feasible(genome, area_size, min_spacing).mean()
+    assert feasible_after == is_feasible(repaired, area_size, min_spacing).mean() > feasible_before
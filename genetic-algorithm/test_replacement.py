@@ -0,0 +1,34 @@
+import random
+import numpy as np
+from genetic_algorithm import genetic_algorithm
+from replacement import steady_state_replacement
+from wind_rose import WIND_ROSE_PATH, WindRose, evaluate_fitness_wind_rose
+
+
+def test_steady_state_keeps_the_best_with_their_fitness(random_positions):
+    population, offspring = random_positions(6, 4, 300, seed=1), random_positions(4, 4, 300, seed=2)
+    fitness_values = np.array([3.0, 9.0, 1.0, 7.0, 5.0, 2.0])
+    offspring_fitness_values = np.array([8.0, 0.0, 6.0, 4.0])
+
+    survivors, survivor_fitness_values = steady_state_replacement(population, offspring, fitness_values,
+                                                                  offspring_fitness_values)
+
+    np.testing.assert_array_equal(survivor_fitness_values, [9.0, 8.0, 7.0, 6.0, 5.0, 4.0])
+    np.testing.assert_array_equal(survivors, np.concatenate([population, offspring])[[1, 6, 3, 8, 4, 9]])
+
+
+def test_carried_fitness_matches_a_new_evaluation(ga_config):
+    random.seed(3)
+    np.random.seed(3)
+    result = genetic_algorithm(dict(ga_config, wind_rose=WIND_ROSE_PATH))
+    (best_fitness, best_layout), (max_fitness_values, layouts), _ = result
+
+    def evaluate(positions):
+        return evaluate_fitness_wind_rose(np.array(positions), ga_config['fitness_weights'], ga_config['area_size'],
+                                          ga_config['min_spacing'], ga_config['wind_speed'],
+                                          WindRose.from_csv(WIND_ROSE_PATH))
+
+    assert best_fitness > 0
+    assert best_fitness == max(max_fitness_values)
+    np.testing.assert_allclose(evaluate(layouts), max_fitness_values, rtol=1e-12)
+    np.testing.assert_allclose(evaluate([best_layout]), [best_fitness], rtol=1e-12)
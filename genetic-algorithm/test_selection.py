@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from selection import (selection_probabilities, roulette_indices, alias_table, alias_indices,
+                       stochastic_universal_indices, tournament_indices, tournament_selection)
+
+
+FITNESS_VALUES = np.array([1.0, 4.0, 0.0, 2.5, 0.5, 2.0])
+
+
+def test_probabilities_shift_negative_fitness():
+    probabilities = selection_probabilities([-3.0, -1.0, 1.0, -np.inf])
+    np.testing.assert_allclose(probabilities, [0.0, 1 / 3, 2 / 3, 0.0])
+    np.testing.assert_allclose(selection_probabilities([0.0, 0.0]), [0.5, 0.5])
+
+
+@pytest.mark.parametrize('draw', [
+    roulette_indices,
+    lambda probabilities, n: alias_indices(alias_table(probabilities), n),
+    stochastic_universal_indices,
+])
+def test_proportional_draws_follow_the_probabilities(draw):
+    np.random.seed(0)
+    probabilities = selection_probabilities(FITNESS_VALUES)
+    n_selected = 200000
+    counts = np.bincount(draw(probabilities, n_selected), minlength=len(probabilities))
+    assert counts[2] == 0
+    np.testing.assert_allclose(counts / n_selected, probabilities, atol=5e-3)
+
+
+def test_stochastic_universal_sampling_has_minimal_spread():
+    np.random.seed(0)
+    probabilities = selection_probabilities(FITNESS_VALUES)
+    for _ in range(20):
+        counts = np.bincount(stochastic_universal_indices(probabilities, 100), minlength=len(probabilities))
+        assert (np.abs(counts - 100 * probabilities) < 1).all()
+
+
+def test_tournament_winners():
+    np.random.seed(0)
+    n_selected = 100000
+    # a tournament of one is a uniform draw
+    counts = np.bincount(tournament_indices(FITNESS_VALUES, n_selected, 1), minlength=len(FITNESS_VALUES))
+    np.testing.assert_allclose(counts / n_selected, 1 / len(FITNESS_VALUES), atol=5e-3)
+    # the worst individual only wins a tournament against itself
+    winners = tournament_indices(FITNESS_VALUES, n_selected, 3)
+    np.testing.assert_allclose((winners == 2).mean(), (1 / len(FITNESS_VALUES)) ** 3, atol=1e-3)
+    assert (winners == 1).mean() == pytest.approx(1 - (5 / 6) ** 3, abs=5e-3)
+
+
+def test_tournament_selection_takes_individuals():
+    np.random.seed(1)
+    population = np.arange(len(FITNESS_VALUES) * 4).reshape(len(FITNESS_VALUES), 2, 2)
+    parents = tournament_selection(population, FITNESS_VALUES, tournament_size=len(FITNESS_VALUES) * 10)
+    assert parents.shape == population.shape
+    assert (parents == population[1]).all(axis=(1, 2)).mean() > 0.9
@@ -0,0 +1,40 @@
+import math
+import random
+import time
+import numpy as np
+import pytest
+from spatial import close_pairs, close_pairs_batch, poisson_disk_layout
+
+
+def test_close_pairs_match_all_pairs(random_positions):
+    positions = random_positions(40, 15, 300)
+    for layout in positions.tolist():
+        expected = [(i, j) for i in range(15) for j in range(i + 1, 15)
+                    if math.dist(layout[i], layout[j]) < 50]
+        assert [(i, j) for i, j, _ in close_pairs(layout, 50)] == expected
+
+    first, second, distances = close_pairs_batch(positions, 50)
+    assert len(first) == sum(len(list(close_pairs(layout, 50))) for layout in positions.tolist())
+    assert (first // 15 == second // 15).all() and (first < second).all()
+    flat_positions = positions.reshape(-1, 2)
+    np.testing.assert_allclose(distances, np.hypot(*(flat_positions[first] - flat_positions[second]).T))
+
+
+@pytest.mark.parametrize('area_size', [300, 10000])
+def test_poisson_disk_layouts_are_valid_and_spread(area_size):
+    random.seed(0)
+    start = time.perf_counter()
+    layouts = np.array([poisson_disk_layout(14, area_size, 50) for _ in range(50)])
+    # the cost does not grow with the site: filling a 10 km site took seconds per layout
+    assert time.perf_counter() - start < 2
+    assert layouts.min() >= 0 and layouts.max() <= area_size
+    assert all(next(close_pairs(layout, 50), None) is None for layout in layouts.tolist())
+    # as spread as uniform positions, whose standard deviation is area_size / sqrt(12)
+    assert layouts.std(axis=1).mean() == pytest.approx(area_size / math.sqrt(12), rel=0.1)
+
+
+def test_crowded_site_is_topped_up():
+    random.seed(0)
+    layout = poisson_disk_layout(60, 300, 50)
+    assert len(layout) == 60
+    assert all(0 <= x <= 300 and 0 <= y <= 300 for x, y in layout)
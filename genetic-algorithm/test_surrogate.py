@@ -0,0 +1,44 @@
+import numpy as np
+from fitness import penalty_terms
+from surrogate import KNNSurrogate, SurrogateScreen, layout_features
+from utils import encode_genome
+
+
+def test_features_ignore_the_turbine_order(ga_config, random_positions):
+    area_size, min_spacing = ga_config['area_size'], ga_config['min_spacing']
+    positions = random_positions(30, 10, area_size + 20)
+    features = layout_features(positions, area_size, min_spacing)
+    shuffled = positions[:, np.random.default_rng(0).permutation(10)]
+    np.testing.assert_array_equal(layout_features(shuffled, area_size, min_spacing), features)
+    # every pair lands in one distance bin, then the penalties of the fitness
+    assert (features[:, :16].sum(axis=1) == 10 * 9 // 2).all()
+    boundary_fitness, spacing_fitness, _ = penalty_terms(positions, area_size, min_spacing)
+    np.testing.assert_array_equal(features[:, 16:], np.stack([-spacing_fitness, -boundary_fitness], axis=1))
+
+
+def test_knn_reproduces_its_samples():
+    features = np.random.default_rng(0).normal(size=(40, 5))
+    fitness_values = features @ np.arange(5.0)
+    model = KNNSurrogate(k=3)
+    model.add(features, fitness_values)
+    np.testing.assert_allclose(model.predict(features), fitness_values, rtol=1e-6, atol=1e-6)
+
+
+def test_screen_evaluates_the_budget(ga_config, random_positions):
+    np.random.seed(0)
+    screen = SurrogateScreen(ga_config['area_size'], ga_config['min_spacing'], budget=0.25, exploration=0.25,
+                             min_samples=20)
+    population = encode_genome(random_positions(80, 8, 1 << 9, seed=1), 9)
+
+    def evaluate(population):
+        # a fitness the features determine: fewer too close pairs is better
+        return -layout_features(population.astype(float), ga_config['area_size'], ga_config['min_spacing'])[:, 16]
+
+    offspring, fitness_values, stats = screen.screen(population[:20], evaluate)
+    assert len(offspring) == 20 and stats == {'surrogate_screened': 0}
+    offspring, fitness_values, stats = screen.screen(population[20:], evaluate)
+    assert len(offspring) == len(fitness_values) == 15
+    assert stats['surrogate_screened'] == 45
+    np.testing.assert_array_equal(fitness_values, evaluate(offspring))
+    assert -1 <= stats['surrogate_rank_correlation'] <= 1 and stats['surrogate_mae'] >= 0
+    assert len(screen.model) == 35
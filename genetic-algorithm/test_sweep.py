@@ -0,0 +1,41 @@
+import csv
+import pytest
+from sweep import parameter_grid, sweep
+from wind_rose import WIND_ROSE_PATH
+
+
+def test_parameter_grid():
+    assert parameter_grid({'a': [1, 2], 'b': ['x']}) == [{'a': 1, 'b': 'x'}, {'a': 2, 'b': 'x'}]
+
+
+@pytest.fixture
+def sweep_config(ga_config):
+    return dict(ga_config, wind_rose=WIND_ROSE_PATH, max_generations=8)
+
+
+def test_successive_halving_keeps_the_best_half(sweep_config):
+    param_grid = {'mutation_rate': [0.005, 0.02], 'population_size': [10, 16]}
+    rows = sweep(sweep_config, param_grid, seeds=[1, 2], min_generations=2, eta=2)
+
+    rungs = [[row for row in rows if row['rung'] == rung] for rung in range(3)]
+    assert [len(rung) for rung in rungs] == [4, 2, 1]
+    assert [rung[0]['generation_budget'] for rung in rungs] == [2, 4, 8]
+    for rung, next_rung in zip(rungs, rungs[1:]):
+        best = sorted(rung, key=lambda row: -row['mean_best_fitness'])[:len(next_rung)]
+        assert sorted(row['config'] for row in best) == [row['config'] for row in next_rung]
+    assert all(row['max_best_fitness'] >= row['mean_best_fitness'] > 0 for row in rows)
+
+
+def test_parallel_sweep_matches_the_serial_one(tmp_path, sweep_config):
+    param_grid = {'mutation_rate': [0.005, 0.02]}
+    results_path = str(tmp_path / 'sweep.csv')
+    serial = sweep(sweep_config, param_grid, seeds=[1, 2, 3])
+    parallel = sweep(sweep_config, param_grid, seeds=[1, 2, 3], n_workers=2, results_path=results_path)
+
+    def without_times(rows):
+        return [{name: value for name, value in row.items() if name != 'seconds'} for row in rows]
+
+    assert without_times(parallel) == without_times(serial)
+    with open(results_path, newline='') as file:
+        written = list(csv.DictReader(file))
+    assert [float(row['mean_best_fitness']) for row in written] == [row['mean_best_fitness'] for row in serial]
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from wake_sweep import WAKE_DEFICIT, WakeSweep, evaluate_fitness_sweep, wake_cutoff_distance
+from wind_rose import WIND_ROSE_PATH, WindRose, directional_wake_deficit, evaluate_fitness_wind_rose
+
+
+@pytest.fixture
+def wind_rose():
+    return WindRose.from_csv(WIND_ROSE_PATH)
+
+
+def test_cutoff_distance_matches_the_tolerance():
+    for tolerance in (1e-2, 1e-3, 1e-4):
+        distance = wake_cutoff_distance(tolerance)
+        assert WAKE_DEFICIT * (68 / (0.075 * distance + 68)) ** 2 == pytest.approx(tolerance)
+    assert wake_cutoff_distance(1) == 0
+
+
+@pytest.mark.parametrize('tolerance', [1e-2, 3e-3])
+def test_sweep_deficit_is_within_the_bound(wind_rose, random_positions, tolerance):
+    positions = random_positions(20, 25, 4000).astype(float)
+    wake_sweep = WakeSweep(wind_rose, tolerance)
+    exact = directional_wake_deficit(positions, wind_rose)
+    swept = wake_sweep.deficit(positions)
+
+    missing = exact - swept
+    assert missing.min() > -1e-12
+    assert missing.max() <= wake_sweep.max_deficit_error(25)
+    # the sweep does leave out some wakes at this tolerance
+    assert missing.max() > 0
+
+
+def test_sweep_is_exact_beyond_the_site(ga_config, wind_rose, random_positions):
+    positions = random_positions(30, 12, ga_config['area_size'])
+    wake_sweep = WakeSweep(wind_rose, 1e-3)
+    assert wake_sweep.cutoff_distance > ga_config['area_size'] * np.sqrt(2)
+    params = (ga_config['fitness_weights'], ga_config['area_size'], ga_config['min_spacing'], ga_config['wind_speed'])
+    np.testing.assert_allclose(evaluate_fitness_sweep(positions, *params, wake_sweep),
+                               evaluate_fitness_wind_rose(positions, *params, wind_rose), rtol=1e-12, atol=1e-12)
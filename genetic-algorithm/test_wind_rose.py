@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from wind_rose import WIND_ROSE_PATH, WindRose, evaluate_fitness_wind_rose
+
+
+@pytest.fixture
+def wind_rose_config(ga_config):
+    return dict(ga_config, wind_rose=WIND_ROSE_PATH)
+
+
+def test_fitness_does_not_depend_on_the_batch(ga_config, random_positions):
+    wind_rose = WindRose.from_csv(WIND_ROSE_PATH)
+    positions = random_positions(23, 12, ga_config['area_size'])
+    params = (ga_config['fitness_weights'], ga_config['area_size'], ga_config['min_spacing'],
+              ga_config['wind_speed'], wind_rose)
+    batch = evaluate_fitness_wind_rose(positions, *params)
+    one_by_one = np.concatenate([evaluate_fitness_wind_rose(positions[i:i + 1], *params) for i in range(23)])
+    np.testing.assert_array_equal(batch, one_by_one)
+
+
+def test_history_does_not_depend_on_the_workers(wind_rose_config, seeded_run, assert_same_result):
+    serial = seeded_run(dict(wind_rose_config, n_workers=1), 1)
+    assert_same_result(seeded_run(dict(wind_rose_config, n_workers=3), 1), serial)
+
+
+def test_resume_with_the_cache_is_bit_identical(tmp_path, wind_rose_config, seeded_run, assert_same_result):
+    wind_rose_config = dict(wind_rose_config, fitness_cache_size=10000)
+    checkpoint_path = str(tmp_path / 'checkpoint.npz')
+    full = seeded_run(wind_rose_config, 1)
+    seeded_run(dict(wind_rose_config, max_generations=6, checkpoint_path=checkpoint_path, checkpoint_interval=3), 1)
+    resumed = seeded_run(dict(wind_rose_config, resume_from=checkpoint_path), 2)
+    assert_same_result(resumed, full)
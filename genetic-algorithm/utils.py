@@ -1,5 +1,10 @@
 import math
 import random
+import numpy as np
+from spatial import SpatialGrid, close_pairs, poisson_disk_layout
+
+
+GENOME_DTYPE = np.uint16
 
 
 def determine_num_bits(max_coordinate):
@@ -26,24 +31,70 @@ def decode_binary_to_position(binary_string, num_bits):
 
 
 def decode_layout_to_position(layout):
+    if isinstance(layout, np.ndarray):
+        return [tuple(pos) for pos in layout.tolist()]
     num_bits = len(layout[0]) // 2
     return [decode_binary_to_position(pos, num_bits) for pos in layout]
 
 
+def encode_genome(positions, num_bits):
+    """Encode integer positions of shape (pop, n_turbines, 2) to a genome array holding num_bits per coordinate."""
+    genome = np.ascontiguousarray(positions, dtype=GENOME_DTYPE)
+    if np.any(genome >> num_bits):
+        raise ValueError(f"Positions do not fit in {num_bits} bits.")
+    return genome
+
+
+def population_to_genome(population):
+    """Convert a legacy population of binary string layouts to a genome array of shape (pop, n_turbines, 2)."""
+    num_bits = len(population[0][0]) // 2
+    bits = np.frombuffer(''.join(''.join(layout) for layout in population).encode(), dtype=np.uint8) - ord('0')
+    bits = bits.reshape(len(population), len(population[0]), 2, num_bits).astype(GENOME_DTYPE)
+    weights = (1 << np.arange(num_bits - 1, -1, -1)).astype(GENOME_DTYPE)
+    return (bits * weights).sum(axis=-1, dtype=GENOME_DTYPE)
+
+
+def genome_to_population(genome, num_bits):
+    """Convert a genome array back to a legacy population of binary string layouts."""
+    return [[encode_position_to_binary(x, y, num_bits) for x, y in layout] for layout in genome.tolist()]
+
+
+def decode_population(population):
+    """Decode a population of binary string layouts (or a genome array) to an integer array of shape (pop, n_turbines, 2)."""
+    if isinstance(population, np.ndarray):
+        return population.astype(int)
+    num_bits = len(population[0][0]) // 2
+    return np.array([[decode_binary_to_position(pos, num_bits) for pos in layout] for layout in population])
+
+
+def concatenate_populations(population, offspring):
+    """Join two populations, either lists of layouts or genome arrays."""
+    if isinstance(population, np.ndarray):
+        return np.concatenate([population, offspring])
+    return population + offspring
+
+
+def take_individuals(population, indices):
+    """Pick individuals from a population (list of layouts or genome array) by index."""
+    if isinstance(population, np.ndarray):
+        return population[np.asarray(indices, dtype=int)]
+    return [population[i] for i in indices]
+
+
 def euclidean_distance(pos1, pos2):
     return math.sqrt((pos1[0] - pos2[0])**2 + (pos1[1] - pos2[1])**2)
 
 
 def print_population(population, title=''):
     print(title)
-    num_bits = len(population[0][0]) // 2
     for i, layout in enumerate(population):
-        print(i, [decode_binary_to_position(pos, num_bits) for pos in layout])
+        print(i, decode_layout_to_position(layout))
 
 
 def generate_random_correct_layout(n_turbines, area_size, min_spacing, max_attempts=100):
     max_coordinate = area_size  # - min_spacing
     layout = []
+    grid = SpatialGrid(max(min_spacing, 1))
     for _ in range(n_turbines):
         x = random.randint(0, max_coordinate)
         y = random.randint(0, max_coordinate)
@@ -53,12 +104,8 @@ def generate_random_correct_layout(n_turbines, area_size, min_spacing, max_attem
             x = random.randint(0, max_coordinate)
             y = random.randint(0, max_coordinate)
 
-            is_new_position_valid = True
-            for pos in layout:
-                if not is_valid_spacing(pos, (x, y), min_spacing):
-                    is_new_position_valid = False
-                    break
-            if is_new_position_valid:
+            if grid.is_far_enough((x, y), min_spacing):
+                grid.insert((x, y))
                 layout.append([x, y])
                 break
             attempts += 1
@@ -94,13 +141,10 @@ def is_position_within_bounds(position, area_size):
 def is_layout_valid(layout, area_size, min_spacing):
     """Check if the entire layout satisfies the minimum spacing constraint and is within the bounds of the area."""
 
-    for i, pos1 in enumerate(layout):
-        if not is_position_within_bounds(pos1, area_size):
+    for pos in layout:
+        if not is_position_within_bounds(pos, area_size):
             return False
-        for pos2 in layout[i+1:]:
-            if not is_valid_spacing(pos1, pos2, min_spacing):
-                return False
-    return True
+    return next(close_pairs(layout, min_spacing), None) is None
 
 
 def initialize_population(population_size, n_turbines, area_size, min_spacing, max_attempts=100):
@@ -109,8 +153,15 @@ def initialize_population(population_size, n_turbines, area_size, min_spacing, m
     initial_population = []
     num_bits = determine_num_bits(area_size)
     for _ in range(population_size):
-        layout = generate_random_layout(n_turbines, area_size, min_spacing, max_attempts)
+        layout = poisson_disk_layout(n_turbines, area_size, min_spacing)
         encoded_layout = [encode_position_to_binary(pos[0], pos[1], num_bits) for pos in layout]
         initial_population.append(encoded_layout)
 
     return initial_population
+
+
+def initialize_genome(population_size, n_turbines, area_size, min_spacing, max_attempts=100):
+    """Generate random turbine layouts directly as a genome array of shape (pop, n_turbines, 2)."""
+    num_bits = determine_num_bits(area_size)
+    layouts = [poisson_disk_layout(n_turbines, area_size, min_spacing) for _ in range(population_size)]
+    return encode_genome(layouts, num_bits)
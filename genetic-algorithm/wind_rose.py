@@ -0,0 +1,77 @@
+import csv
+import math
+import os
+import numpy as np
+from fitness import ROTOR_RADIUS, C_T, K_W, BATCH_MAX_PAIRS, energy_from_wake_deficit, penalty_terms, \
+    combine_fitness_terms
+
+
+WIND_ROSE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'windFrequencyRose.csv')
+
+
+class WindRose:
+    """Sector frequencies of a wind rose with the per-sector constants precomputed once.
+
+    Directions are meteorological: degrees clockwise from north the wind blows from. For every sector the unit
+    vector of the flow and its normal are stored, which rotate layout offsets into the wind frame."""
+
+    def __init__(self, frequencies, directions):
+        frequencies = np.asarray(frequencies, dtype=float)
+        self.frequencies = frequencies / frequencies.sum()
+        self.directions = np.asarray(directions, dtype=float)
+        directions_rad = np.radians(self.directions)
+        self.flow = np.stack([-np.sin(directions_rad), -np.cos(directions_rad)], axis=-1)
+        self.normal = np.stack([-self.flow[:, 1], self.flow[:, 0]], axis=-1)
+
+    def __len__(self):
+        return len(self.frequencies)
+
+    def mean(self, sector_values):
+        """Frequency weighted mean over the sectors of sector_values of shape (sectors, pop). The sectors are added
+        one by one, whereas a matrix product sums in an order that depends on pop, so a layout gets the same value
+        in any batch."""
+        return (self.frequencies[:, np.newaxis] * sector_values).sum(axis=0)
+
+    @classmethod
+    def from_csv(cls, path=WIND_ROSE_PATH):
+        """Load a wind rose from a csv file with value (frequency) and center_degrees columns."""
+        with open(path, newline='') as file:
+            rows = list(csv.DictReader(file))
+        return cls([float(row['value']) for row in rows], [float(row['center_degrees']) for row in rows])
+
+
+def directional_wake_deficit(positions, wind_rose):
+    """Summed Jensen wake deficit at every turbine for every sector, shape (sectors, pop, n_turbines).
+
+    A turbine is waked by another if it lies downstream of it and inside its wake cone of radius
+    rotor_radius + k_w * d, where d is the downstream distance."""
+    diff = positions[:, :, np.newaxis, :] - positions[:, np.newaxis, :, :]
+    downstream = np.einsum('pijk,sk->spij', diff, wind_rose.flow)
+    crosswind = np.einsum('pijk,sk->spij', diff, wind_rose.normal)
+    wake_radius = ROTOR_RADIUS + K_W * downstream
+    waked = (downstream > 0) & (np.abs(crosswind) < wake_radius)
+    deficit = (1 - math.sqrt(1 - C_T)) * (ROTOR_RADIUS / np.where(waked, wake_radius, ROTOR_RADIUS)) ** 2
+    return np.where(waked, deficit, 0.0).sum(axis=-1)
+
+
+def fitness_terms_wind_rose(positions, area_size, min_spacing, wind_speed, wind_rose, power_curve=None):
+    """Like fitness_terms_batch, but the energy production is the frequency-weighted mean over all sectors."""
+    positions = np.asarray(positions, dtype=float)
+    sector_energy = energy_from_wake_deficit(directional_wake_deficit(positions, wind_rose), wind_speed, power_curve)
+    energy_production = wind_rose.mean(sector_energy)
+    return (energy_production,) + penalty_terms(positions, area_size, min_spacing)
+
+
+def evaluate_fitness_wind_rose(positions, weights, area_size, min_spacing, wind_speed, wind_rose, power_curve=None):
+    """Fitness of decoded layouts of shape (pop, n_turbines, 2) with the energy integrated over a WindRose.
+    All sectors are evaluated in one (sectors, pop, n_turbines, n_turbines) pass, chunked over the population."""
+    positions = np.asarray(positions, dtype=float)
+    population_size, n_turbines = positions.shape[:2]
+    chunk_size = max(1, BATCH_MAX_PAIRS // max(1, len(wind_rose) * n_turbines * n_turbines))
+
+    fitness_values = np.empty(population_size)
+    for start in range(0, population_size, chunk_size):
+        terms = fitness_terms_wind_rose(positions[start:start + chunk_size], area_size, min_spacing, wind_speed,
+                                        wind_rose, power_curve)
+        fitness_values[start:start + chunk_size] = combine_fitness_terms(weights, *terms)
+    return fitness_values